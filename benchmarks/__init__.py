@@ -0,0 +1,4 @@
+# The benchmarks import the bot's packages, run them from the repository root as modules:
+#   python -m benchmarks.join_raid --help
+#   python -m benchmarks.core_queries --help
+#   python -m benchmarks.name_filter --help
@@ -0,0 +1,110 @@
+import argparse
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List
+
+from benchmarks.join_raid import configure_environment
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="ORM vs Core data access for the chat_member path")
+    parser.add_argument("--database-url", help="database to benchmark against, its tables are dropped")
+    parser.add_argument("--number", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    return parser.parse_args()
+
+
+async def measure(operation: Callable[[int], Awaitable[None]], number: int) -> Dict[str, float]:
+    cpu_started_at = time.process_time()
+    started_at = time.perf_counter()
+
+    for index in range(number):
+        await operation(index)
+
+    return {
+        "cpu_us": (time.process_time() - cpu_started_at) / number * 1e6,
+        "wall_us": (time.perf_counter() - started_at) / number * 1e6,
+    }
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Dict[str, Dict[str, float]]]:
+    from database.cache import CachedChat
+    from database.core_queries import find_chat_record, write_member_statuses
+    from database.engine import drop_db, engine, migrate_db, session_maker
+    from database.orm_queries import add_chat, find_chat_by_telegram_id, get_member_values, record_member_statuses
+
+    await drop_db()
+    await migrate_db()
+
+    async with session_maker() as session:
+        chat = await add_chat(session, "-1001000000000", "Benchmark", None)
+
+    def get_members(offset: int, count: int) -> List[dict]:
+        now = datetime.now()
+        return [
+            get_member_values(str(offset + index), chat.id, "user", "Ivan", None, False, "join", now)
+            for index in range(count)
+        ]
+
+    async def orm_lookup(_: int) -> None:
+        async with session_maker() as session:
+            CachedChat.from_chat(await find_chat_by_telegram_id(session, chat.telegram_id))
+
+    async def core_lookup(_: int) -> None:
+        async with engine.connect() as connection:
+            await find_chat_record(connection, chat.telegram_id)
+
+    async def orm_write(index: int) -> None:
+        async with session_maker() as session:
+            await record_member_statuses(session, get_members(index, 1))
+
+    async def core_write(index: int) -> None:
+        async with engine.begin() as connection:
+            await write_member_statuses(connection, get_members(index, 1))
+
+    async def orm_batch_write(index: int) -> None:
+        async with session_maker() as session:
+            await record_member_statuses(session, get_members(index * args.batch_size, args.batch_size))
+
+    async def core_batch_write(index: int) -> None:
+        async with engine.begin() as connection:
+            await write_member_statuses(connection, get_members(index * args.batch_size, args.batch_size))
+
+    batches = max(1, args.number // args.batch_size)
+    results = {
+        "chat_lookup": {
+            "orm": await measure(orm_lookup, args.number),
+            "core": await measure(core_lookup, args.number),
+        },
+        "single_write": {
+            "orm": await measure(orm_write, args.number),
+            "core": await measure(core_write, args.number),
+        },
+        f"batch_write_{args.batch_size}": {
+            "orm": await measure(orm_batch_write, batches),
+            "core": await measure(core_batch_write, batches),
+        },
+    }
+
+    await engine.dispose()
+    return results
+
+
+def main():
+    args = parse_args()
+    configure_environment(args)
+    logging.basicConfig(level=logging.WARNING)
+
+    for name, result in asyncio.run(run(args)).items():
+        orm, core = result["orm"], result["core"]
+        print(
+            f"{name:<20} orm {orm['cpu_us']:9.1f} us cpu {orm['wall_us']:9.1f} us wall   "
+            f"core {core['cpu_us']:9.1f} us cpu {core['wall_us']:9.1f} us wall   "
+            f"cpu saved {orm['cpu_us'] - core['cpu_us']:8.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+from aiogram import Bot
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import TelegramMethod
+from aiogram.types import Update
+
+
+NAMES = {
+    "latin": [("Ivan", "Petrov"), ("Anna", None), ("John", "Smith"), ("Maria", "Garcia"), ("Alex", None)],
+    "arabic": [("محمد", "علي"), ("فاطمة", None), ("ﻣﺤﻤﺪ", None)],
+    "cjk": [("张伟", None), ("李娜", "王"), ("王芳", None)],
+    "emoji": [("😀🔥", None), ("🚀", "💰"), ("⭐️⭐️", None)],
+}
+
+FIRST_CHAT_ID = -1001000000000
+FIRST_USER_ID = 7000000000
+
+
+class RecordingSession(BaseSession):
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls: Counter = Counter()
+
+    async def make_request(self, bot: Bot, method: TelegramMethod, timeout: Optional[int] = None):
+        self.calls[method.__api_method__] += 1
+        return True
+
+    async def stream_content(self, url, headers=None, timeout=30, chunk_size=65536, raise_for_status=True):
+        yield b""
+
+    async def close(self) -> None:
+        pass
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Synthetic join-raid benchmark for the chat_member pipeline")
+    parser.add_argument("--database-url", help="database to benchmark against, its tables are dropped")
+    parser.add_argument("--chats", type=int, default=5)
+    parser.add_argument("--joins-per-chat", type=int, default=400)
+    parser.add_argument("--allowed-members", type=int, default=250)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--mix", default="latin=70,arabic=10,cjk=10,emoji=10", help="name script weights")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default="join_raid.json")
+    return parser.parse_args()
+
+
+def configure_environment(args: argparse.Namespace) -> None:
+    if not args.database_url:
+        args.database_url = f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'join_raid.db')}"
+
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ["DATABASE_ECHO"] = "false"
+    os.environ["STATE_BACKEND"] = "memory"
+    os.environ["BAN_RATE_LIMIT"] = "1000000"
+    os.environ["BAN_CHAT_RATE_LIMIT"] = "1000000"
+    os.environ["RAID_JOIN_THRESHOLD"] = "0"
+    os.environ.setdefault("BOT_TOKEN", "123456:ABCDEF")
+    os.environ.setdefault("ADMIN_TELEGRAM_IDS", "[]")
+    os.environ.setdefault("PAGE_LIMIT", "10")
+
+
+def parse_mix(mix: str) -> Dict[str, int]:
+    weights = {}
+    for item in mix.split(","):
+        script, weight = item.split("=")
+        if script not in NAMES:
+            raise ValueError(f"Unknown name script: {script}")
+
+        weights[script] = int(weight)
+
+    return weights
+
+
+def build_join_update(update_id: int, chat_id: int, user_id: int, first_name: str, last_name: Optional[str]) -> Update:
+    user = {"id": user_id, "is_bot": False, "first_name": first_name}
+    if last_name:
+        user["last_name"] = last_name
+
+    return Update.model_validate({
+        "update_id": update_id,
+        "chat_member": {
+            "chat": {"id": chat_id, "type": "supergroup", "title": f"Raid {chat_id}"},
+            "from": user,
+            "date": int(time.time()),
+            "old_chat_member": {"status": "left", "user": user},
+            "new_chat_member": {"status": "member", "user": user},
+        },
+    })
+
+
+def build_updates(args: argparse.Namespace) -> List[Update]:
+    rng = random.Random(args.seed)
+    weights = parse_mix(args.mix)
+    scripts, script_weights = list(weights), list(weights.values())
+
+    updates = []
+    for index in range(args.chats * args.joins_per_chat):
+        first_name, last_name = rng.choice(NAMES[rng.choices(scripts, script_weights)[0]])
+        chat_id = FIRST_CHAT_ID - index % args.chats
+        updates.append(build_join_update(index + 1, chat_id, FIRST_USER_ID + index, first_name, last_name))
+
+    rng.shuffle(updates)
+    return updates
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    if not values:
+        return 0.0
+
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(q * (len(ordered) - 1)))]
+
+
+def get_version() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args: argparse.Namespace) -> dict:
+    from sqlalchemy import event, select
+
+    from bot import create_dispatcher
+    from database.engine import drop_db, engine, migrate_db, session_maker
+    from database.models import Member, MemberStatus
+    from database.orm_queries import add_chat, set_chat_allowed_members
+    from handlers import group
+    from services.ban_executor import ban_executor
+    from services.chat_shards import chat_shard_executor
+    from services.member_writer import member_writer
+    from services.name_filter import get_name_filter
+    from services.state import join_counters
+
+    await drop_db()
+    await migrate_db()
+
+    async with session_maker() as session:
+        chats = {}
+        for index in range(args.chats):
+            telegram_id = FIRST_CHAT_ID - index
+            chat = await add_chat(session, str(telegram_id), f"Raid {telegram_id}", None)
+            chats[chat.id] = await set_chat_allowed_members(session, chat, args.allowed_members)
+
+        await join_counters.load(session)
+
+    updates = build_updates(args)
+
+    join_order: Dict[int, List[str]] = {}
+    for update in updates:
+        chat_member = update.chat_member
+        join_order.setdefault(chat_member.chat.id, []).append(str(chat_member.new_chat_member.user.id))
+
+    latencies: List[float] = []
+    process_member_status = group.process_member_status
+
+    async def timed_process_member_status(*handler_args, **handler_kwargs):
+        started_at = time.perf_counter()
+        try:
+            return await process_member_status(*handler_args, **handler_kwargs)
+
+        finally:
+            latencies.append(time.perf_counter() - started_at)
+
+    group.process_member_status = timed_process_member_status
+
+    queries = 0
+
+    def count_query(*_) -> None:
+        nonlocal queries
+        queries += 1
+
+    event.listen(engine.sync_engine, "after_cursor_execute", count_query)
+
+    recording_session = RecordingSession()
+    bot = Bot(token=os.environ["BOT_TOKEN"], session=recording_session)
+    dp = create_dispatcher()
+    member_writer.start()
+    ban_executor.start(bot)
+    chat_shard_executor.start()
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    errors: Counter = Counter()
+
+    async def feed(update: Update) -> None:
+        async with semaphore:
+            try:
+                await dp.feed_update(bot, update)
+
+            except Exception as e:
+                errors[type(e).__name__] += 1
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(feed(update) for update in updates))
+    await chat_shard_executor.stop()
+    await member_writer.stop()
+    duration = time.perf_counter() - started_at
+
+    await ban_executor.stop()
+    event.remove(engine.sync_engine, "after_cursor_execute", count_query)
+    group.process_member_status = process_member_status
+
+    chat_results = []
+    async with session_maker() as session:
+        for chat_id, chat in chats.items():
+            name_filter = get_name_filter(chat.filter_profile)
+            members = (await session.execute(
+                select(Member.telegram_id, Member.status, Member.first_name, Member.last_name).where(Member.chat_id == chat_id)
+            )).all()
+
+            statuses = Counter(member.status for member in members)
+            misclassified = sum(
+                1 for member in members
+                if member.status in (MemberStatus.JOIN.value, MemberStatus.BAN_BY_FILTER.value)
+                and bool(name_filter.check(" ".join(filter(None, (member.first_name, member.last_name)))))
+                != (member.status == MemberStatus.BAN_BY_FILTER.value)
+            )
+            expected_ban_by_join = max(0, args.joins_per_chat - (args.allowed_members - 1))
+            late_joiners = set(join_order[int(chat.telegram_id)][args.allowed_members - 1:])
+            banned_by_join = {member.telegram_id for member in members if member.status == MemberStatus.BAN_BY_JOIN.value}
+
+            chat_results.append({
+                "chat_id": chat_id,
+                "members": len(members),
+                "statuses": dict(statuses),
+                "expected_ban_by_join": expected_ban_by_join,
+                "misclassified": misclassified,
+                "ordered": banned_by_join == late_joiners,
+                "ok": (
+                    len(members) == args.joins_per_chat
+                    and statuses[MemberStatus.BAN_BY_JOIN.value] == expected_ban_by_join
+                    and misclassified == 0
+                ),
+            })
+
+    await engine.dispose()
+
+    events = len(updates)
+    bans = sum(sum(v for k, v in result["statuses"].items() if k != MemberStatus.JOIN.value) for result in chat_results)
+
+    return {
+        "events": events,
+        "errors": dict(errors),
+        "duration_seconds": duration,
+        "throughput_per_second": events / duration if duration else 0.0,
+        "process_member_status_seconds": {
+            "p50": percentile(latencies, 0.50),
+            "p99": percentile(latencies, 0.99),
+            "max": max(latencies, default=0.0),
+            "mean": sum(latencies) / len(latencies) if latencies else 0.0,
+        },
+        "queries": queries,
+        "queries_per_event": queries / events if events else 0.0,
+        "api_calls": dict(recording_session.calls),
+        "bans": bans,
+        "cutoff_ok": all(result["ok"] for result in chat_results) and recording_session.calls["banChatMember"] == bans,
+        "ordered": all(result["ordered"] for result in chat_results),
+        "chats": chat_results,
+    }
+
+
+def main():
+    args = parse_args()
+    configure_environment(args)
+    logging.basicConfig(level=logging.WARNING)
+
+    results = asyncio.run(run(args))
+
+    report = {
+        "benchmark": "join_raid",
+        "version": get_version(),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "database": args.database_url.split(":", 1)[0],
+        "parameters": {
+            "chats": args.chats,
+            "joins_per_chat": args.joins_per_chat,
+            "allowed_members": args.allowed_members,
+            "concurrency": args.concurrency,
+            "mix": parse_mix(args.mix),
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+
+    latency = results["process_member_status_seconds"]
+    print(f"events           {results['events']}")
+    print(f"throughput       {results['throughput_per_second']:.1f} events/s")
+    print(f"latency p50/p99  {latency['p50'] * 1e3:.2f} / {latency['p99'] * 1e3:.2f} ms")
+    print(f"queries/event    {results['queries_per_event']:.2f}")
+    print(f"cutoff           {'ok' if results['cutoff_ok'] else 'FAILED'}")
+    print(f"ordered          {'ok' if results['ordered'] else 'no'}")
+    print(f"report           {args.output}")
+
+
+if __name__ == "__main__":
+    main()
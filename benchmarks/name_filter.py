@@ -0,0 +1,61 @@
+import argparse
+import re
+import timeit
+
+from services.name_filter import FILTER_PROFILES
+
+
+NAMES = [
+    ("Ivan Petrov", "ivan_petrov"),
+    ("Мария", None),
+    ("محمد علي", "mohammed"),
+    ("ﻣﺤﻤﺪ", None),
+    ("张伟", "zhang"),
+    ("😀🔥", None),
+    ("𝐂𝐑𝐘𝐏𝐓𝐎 signals", "crypto_signals"),
+    ("Anna", "anna_1999"),
+]
+
+
+def contains_arabic_or_chinese_symbol(text):
+    arabic_range = re.compile(r'[\u0600-\u06FF]')
+    chinese_range = re.compile(r'[\u4E00-\u9FFF]')
+
+    contains_arabic = arabic_range.search(text) is not None
+    contains_chinese = chinese_range.search(text) is not None
+
+    return contains_arabic or contains_chinese
+
+
+def run_legacy():
+    for full_name, _ in NAMES:
+        contains_arabic_or_chinese_symbol(full_name)
+
+
+def make_profile_runner(profile: str):
+    name_filter = FILTER_PROFILES[profile]
+
+    def run():
+        for full_name, username in NAMES:
+            name_filter.check(full_name, username)
+
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Name filter micro-benchmark")
+    parser.add_argument("--number", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    runners = {"legacy": run_legacy}
+    runners.update({f"profile:{profile}": make_profile_runner(profile) for profile in FILTER_PROFILES})
+
+    for name, runner in runners.items():
+        best = min(timeit.repeat(runner, number=args.number, repeat=args.repeat))
+        per_name = best / (args.number * len(NAMES)) * 1e9
+        print(f"{name:<20} {per_name:8.1f} ns/name")
+
+
+if __name__ == "__main__":
+    main()
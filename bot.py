@@ -3,36 +3,125 @@ import asyncio
 import logging
 
 from aiogram import Bot, Dispatcher
+from aiogram.exceptions import TelegramAPIError
 
-from database.engine import create_db, drop_db, session_maker
+from database.engine import check_db, drop_db, engine, migrate_db, session_maker
+from database.orm_queries import get_all_chats, get_default_message_text, load_chat_cache
 from middlewares.db import DatabaseSessionMiddleware
+from middlewares.metrics import HandlerMetricsMiddleware
+from middlewares.sharding import ChatShardMiddleware
+from services.ban_executor import ban_executor
+from services.blocklist import blocklist
+from services.chat_shards import chat_shard_executor
+from services.chat_transfer import dump_chats, get_file_format, import_chats
+from services.member_writer import member_writer
+from services.metrics import start_metrics_server
+from services.retention import member_retention
+from services.state import state_backend, join_counters
+from services.telegram_session import create_telegram_session
+from services.webhook import run_webhook
 
 from handlers import user, admin, group
 
 from config_reader import config
 
 
-async def on_startup(bot: Bot) -> None:
+def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser()
     parser.add_argument("--drop-database", action="store_true")
     parser.add_argument("--no-drop-database", action="store_false")
-    args = parser.parse_args()
+    parser.add_argument("--webhook", action="store_true")
+    parser.add_argument("--import-chats", metavar="PATH", help="import whitelisted chats from a CSV/JSON file and exit")
+    parser.add_argument("--export-chats", metavar="PATH", help="export whitelisted chats to a CSV/JSON file and exit")
+    return parser.parse_args()
 
-    if args.drop_database:
+
+async def send_admin_message(bot: Bot, admin_telegram_id: int, text: str) -> None:
+    try:
+        await asyncio.wait_for(bot.send_message(admin_telegram_id, text), config.admin_notify_timeout)
+
+    except (TelegramAPIError, asyncio.TimeoutError) as e:
+        logging.warning("Failed to notify admin %s: %r", admin_telegram_id, e)
+
+
+async def notify_admins(bot: Bot, text: str) -> None:
+    await asyncio.gather(
+        *(send_admin_message(bot, admin_telegram_id, text) for admin_telegram_id in config.admin_telegram_ids)
+    )
+
+
+async def on_startup(bot: Bot, drop_database: bool = False) -> None:
+    if drop_database:
         await drop_db()
 
-    await create_db()
+    await migrate_db()
+    await check_db()
+
+    async with session_maker() as session:
+        await join_counters.load(session)
+        chats = await load_chat_cache(session)
+        await get_default_message_text(session)
+
+    blocked_users = await blocklist.load()
+    logging.info("Preloaded %s whitelisted chats and %s blocked users", chats, blocked_users)
 
-    for admin_telegram_id in config.admin_telegram_ids:
-        await bot.send_message(admin_telegram_id, "Бот запущен")
+    member_writer.start()
+    blocklist.start()
+    ban_executor.start(bot)
+    chat_shard_executor.start()
+    member_retention.start()
+
+    await notify_admins(bot, "Бот запущен")
 
 
 async def on_shutdown(bot: Bot) -> None:
-    for admin_telegram_id in config.admin_telegram_ids:
-        await bot.send_message(admin_telegram_id, "Бот остановлен")
+    await chat_shard_executor.stop()
+    await member_retention.stop()
+    await member_writer.stop()
+    await blocklist.stop()
+    await ban_executor.stop()
+
+    await notify_admins(bot, "Бот остановлен")
+
+
+async def transfer_chats(args: argparse.Namespace) -> None:
+    await migrate_db()
+
+    try:
+        async with session_maker() as session:
+            if args.import_chats:
+                with open(args.import_chats, "rb") as file:
+                    report = await import_chats(session, file.read(), get_file_format(args.import_chats))
+
+                print(report.to_text())
+
+            if args.export_chats:
+                chats = await get_all_chats(session)
+                with open(args.export_chats, "wb") as file:
+                    file.write(dump_chats(chats, get_file_format(args.export_chats)))
+
+                print(f"Exported {len(chats)} chats to {args.export_chats}")
 
+    finally:
+        await engine.dispose()
 
-async def main():
+
+def create_dispatcher() -> Dispatcher:
+    dp = Dispatcher(storage=state_backend.create_storage())
+    dp.chat_member.outer_middleware(ChatShardMiddleware(chat_shard_executor))
+
+    for observer in (dp.message, dp.callback_query, dp.chat_member):
+        observer.middleware(HandlerMetricsMiddleware())
+        observer.middleware(DatabaseSessionMiddleware(session_pool=session_maker))
+
+    dp.include_router(admin.router)
+    dp.include_router(user.router)
+    dp.include_router(group.router)
+
+    return dp
+
+
+async def main(args: argparse.Namespace):
     logging.basicConfig(level=logging.INFO)
 
     file_handler = logging.FileHandler("bot.log")
@@ -44,21 +133,38 @@ async def main():
     logger = logging.getLogger()
     logger.addHandler(file_handler)
 
-    bot = Bot(token=config.bot_token.get_secret_value())
-    dp = Dispatcher()
+    bot = Bot(token=config.bot_token.get_secret_value(), session=create_telegram_session())
 
+    dp = create_dispatcher()
+    dp["drop_database"] = args.drop_database
     dp.startup.register(on_startup)
     dp.shutdown.register(on_shutdown)
 
-    dp.update.middleware(DatabaseSessionMiddleware(session_pool=session_maker))
+    metrics_runner = None
+    if config.metrics_port:
+        metrics_runner = await start_metrics_server(config.metrics_host, config.metrics_port)
 
-    dp.include_router(admin.router)
-    dp.include_router(user.router)
-    dp.include_router(group.router)
+    try:
+        if args.webhook:
+            await run_webhook(dp, bot)
 
-    await bot.delete_webhook(drop_pending_updates=True)
-    await dp.start_polling(bot)
+        else:
+            await bot.delete_webhook(drop_pending_updates=True)
+            await dp.start_polling(bot)
+
+    finally:
+        if metrics_runner:
+            await metrics_runner.cleanup()
+
+        await state_backend.close()
+        await engine.dispose()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    arguments = parse_args()
+
+    if arguments.import_chats or arguments.export_chats:
+        asyncio.run(transfer_chats(arguments))
+
+    else:
+        asyncio.run(main(arguments))
@@ -1,7 +1,7 @@
-from typing import Set
+from typing import Literal, Optional, Set
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from pydantic import SecretStr
+from pydantic import SecretStr, model_validator
 
 
 class Settings(BaseSettings):
@@ -9,8 +9,72 @@ class Settings(BaseSettings):
     database_url: str
     admin_telegram_ids: Set[int]
     page_limit: int
+    database_echo: bool = False
+    database_pool_size: Optional[int] = None
+    database_max_overflow: Optional[int] = None
+    database_pool_pre_ping: Optional[bool] = None
+    database_pool_recycle: Optional[int] = None
+    database_statement_cache_size: Optional[int] = None
+    database_statement_timeout: Optional[float] = None
+
+    ban_rate_limit: float = 25.0
+    ban_chat_rate_limit: float = 10.0
+    ban_workers: int = 4
+    ban_dedup_ttl: int = 60
+
+    state_backend: Literal["memory", "redis"] = "memory"
+    redis_url: Optional[str] = None
+    redis_prefix: str = "antispam"
+
+    default_reply_window: float = 3600.0
+    default_reply_cache_size: int = 10000
+
+    chat_cache_ttl: float = 30.0
+    chat_shards: int = 8
+
+    blocklist_flush_interval: float = 5.0
+    blocklist_reload_interval: float = 60.0
+
+    raid_join_threshold: int = 50
+    raid_window: int = 10
+    raid_duration: float = 600.0
+
+    member_write_batch_size: int = 500
+    member_write_interval: float = 0.2
+    member_write_queue_size: int = 10000
+
+    member_export_batch_size: int = 1000
+
+    member_retention_days: int = 30
+    retention_interval: float = 3600.0
+    retention_batch_size: int = 1000
+
+    webhook_base_url: Optional[str] = None
+    webhook_host: str = "0.0.0.0"
+    webhook_port: int = 8080
+    webhook_path: str = "/webhook"
+    webhook_secret: Optional[SecretStr] = None
+
+    admin_notify_timeout: float = 5.0
+
+    telegram_connection_limit: int = 100
+    telegram_keepalive_timeout: float = 30.0
+    telegram_request_timeout: float = 30.0
+    telegram_retry_attempts: int = 3
+    telegram_retry_backoff: float = 0.5
+    telegram_retry_max_backoff: float = 5.0
+
+    metrics_host: str = "0.0.0.0"
+    metrics_port: Optional[int] = None
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
+    @model_validator(mode="after")
+    def check_redis_url(self) -> "Settings":
+        if self.state_backend == "redis" and not self.redis_url:
+            raise ValueError("REDIS_URL is required when STATE_BACKEND=redis")
+
+        return self
+
 
 config = Settings()
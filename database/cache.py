@@ -0,0 +1,73 @@
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple, Union
+
+from config_reader import config
+from database.models import Chat
+
+
+@dataclass(frozen=True, slots=True)
+class CachedChat:
+    id: int
+    allowed_members: int
+    arab_filter_flag: bool
+    filter_profile: str
+    use_blocklist: bool = True
+
+    @classmethod
+    def from_chat(cls, chat: Chat) -> "CachedChat":
+        return cls(
+            id=chat.id,
+            allowed_members=chat.allowed_members,
+            arab_filter_flag=bool(chat.arab_filter_flag),
+            filter_profile=chat.filter_profile,
+            use_blocklist=bool(chat.use_blocklist)
+        )
+
+
+class _Missing:
+    pass
+
+
+MISSING = _Missing()
+
+
+class ChatCache:
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        # None marks a chat that is known not to be whitelisted, entries expire so that changes made
+        # by other bot instances are picked up
+        self._chats: Dict[str, Tuple[float, Optional[CachedChat]]] = {}
+
+    def get(self, telegram_id: str) -> Union[CachedChat, None, _Missing]:
+        entry = self._chats.get(telegram_id)
+        if entry is None or entry[0] <= time.monotonic():
+            return MISSING
+
+        return entry[1]
+
+    def put(self, chat: Chat) -> CachedChat:
+        cached_chat = CachedChat.from_chat(chat)
+        self.put_cached(chat.telegram_id, cached_chat)
+        return cached_chat
+
+    def put_cached(self, telegram_id: str, cached_chat: Optional[CachedChat]) -> None:
+        self._chats[telegram_id] = (time.monotonic() + self.ttl, cached_chat)
+
+    def put_missing(self, telegram_id: str) -> None:
+        self.put_cached(telegram_id, None)
+
+
+class DefaultMessageCache:
+    def __init__(self) -> None:
+        self._text: Union[str, None, _Missing] = MISSING
+
+    def get(self) -> Union[str, None, _Missing]:
+        return self._text
+
+    def put(self, text: Optional[str]) -> None:
+        self._text = text
+
+
+chat_cache = ChatCache(ttl=config.chat_cache_ttl)
+default_message_cache = DefaultMessageCache()
@@ -0,0 +1,91 @@
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import bindparam, delete, select, Insert
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from database.cache import CachedChat, chat_cache, MISSING
+from database.models import BlockedUser, Chat
+from database.orm_queries import build_member_upsert, build_chat_daily_stats_increment, collapse_member_statuses, \
+    UPSERT_DIALECTS
+
+
+CHAT_BY_TELEGRAM_ID = (
+    select(Chat.id, Chat.allowed_members, Chat.arab_filter_flag, Chat.filter_profile, Chat.use_blocklist)
+    .where(Chat.telegram_id == bindparam("telegram_id"))
+)
+
+_member_upserts: Dict[str, Insert] = {}
+_chat_daily_stats_increments: Dict[str, Insert] = {}
+_blocked_user_inserts: Dict[str, Insert] = {}
+
+
+def get_member_upsert(dialect_name: str) -> Insert:
+    query = _member_upserts.get(dialect_name)
+    if query is None:
+        query = _member_upserts[dialect_name] = build_member_upsert(dialect_name)
+
+    return query
+
+
+def get_chat_daily_stats_increment(dialect_name: str) -> Insert:
+    query = _chat_daily_stats_increments.get(dialect_name)
+    if query is None:
+        query = _chat_daily_stats_increments[dialect_name] = build_chat_daily_stats_increment(dialect_name)
+
+    return query
+
+
+async def find_chat_record(connection: AsyncConnection, telegram_id: str) -> Optional[CachedChat]:
+    result = await connection.execute(CHAT_BY_TELEGRAM_ID, {"telegram_id": telegram_id})
+    row = result.first()
+    if row is None:
+        return None
+
+    chat_id, allowed_members, arab_filter_flag, filter_profile, use_blocklist = row
+    return CachedChat(chat_id, allowed_members, bool(arab_filter_flag), filter_profile, bool(use_blocklist))
+
+
+async def find_cached_chat_record(bind: AsyncEngine, telegram_id: str) -> Optional[CachedChat]:
+    cached_chat = chat_cache.get(telegram_id)
+    if cached_chat is not MISSING:
+        return cached_chat
+
+    async with bind.connect() as connection:
+        cached_chat = await find_chat_record(connection, telegram_id)
+
+    chat_cache.put_cached(telegram_id, cached_chat)
+    return cached_chat
+
+
+async def write_member_statuses(connection: AsyncConnection, members: List[Dict[str, Any]]) -> None:
+    dialect_name = connection.dialect.name
+    latest_members, stats = collapse_member_statuses(members)
+
+    await connection.execute(get_member_upsert(dialect_name), latest_members)
+
+    if stats:
+        await connection.execute(get_chat_daily_stats_increment(dialect_name), stats)
+
+
+def get_blocked_user_insert(dialect_name: str) -> Insert:
+    query = _blocked_user_inserts.get(dialect_name)
+    if query is None:
+        query = _blocked_user_inserts[dialect_name] = (
+            UPSERT_DIALECTS[dialect_name](BlockedUser).on_conflict_do_nothing(index_elements=[BlockedUser.telegram_id])
+        )
+
+    return query
+
+
+async def get_blocked_user_ids(connection: AsyncConnection) -> List[int]:
+    result = await connection.execute(select(BlockedUser.telegram_id))
+    return list(result.scalars())
+
+
+async def add_blocked_users(connection: AsyncConnection, users: List[Dict[str, Any]]) -> None:
+    await connection.execute(get_blocked_user_insert(connection.dialect.name), users)
+
+
+async def delete_blocked_user(connection: AsyncConnection, telegram_id: int) -> bool:
+    result = await connection.execute(delete(BlockedUser).where(BlockedUser.telegram_id == telegram_id))
+    return result.rowcount > 0
@@ -0,0 +1,112 @@
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models import MemberStatus
+from database.orm_queries import get_chat_daily_stats
+
+
+BAN_FIELDS = {
+    MemberStatus.BAN_BY_JOIN: "ban_by_join",
+    MemberStatus.BAN_BY_RAID: "ban_by_join",
+    MemberStatus.BAN_BY_FILTER: "ban_by_filter",
+}
+
+
+@dataclass(slots=True)
+class DailyCounter:
+    total: int = 0
+    ban_by_join: int = 0
+    ban_by_filter: int = 0
+
+
+class JoinCounters:
+    def __init__(self) -> None:
+        self._day = date.today()
+        self._counters: Dict[int, DailyCounter] = {}
+
+    def _rollover(self) -> None:
+        today = date.today()
+        if today != self._day:
+            self._day = today
+            self._counters = {}
+
+    def _get(self, chat_id: int) -> DailyCounter:
+        self._rollover()
+
+        counter = self._counters.get(chat_id)
+        if counter is None:
+            counter = self._counters[chat_id] = DailyCounter()
+
+        return counter
+
+    async def load(self, session: AsyncSession) -> None:
+        self._day = date.today()
+        self._counters = {}
+
+        for stats in await get_chat_daily_stats(session, self._day):
+            self._counters[stats.chat_id] = DailyCounter(
+                total=stats.total,
+                ban_by_join=stats.ban_by_join,
+                ban_by_filter=stats.ban_by_filter
+            )
+
+    async def get(self, chat_id: int) -> DailyCounter:
+        return self._get(chat_id)
+
+    async def add_join(self, chat_id: int) -> int:
+        counter = self._get(chat_id)
+        counter.total += 1
+        return counter.total
+
+    async def add_ban(self, chat_id: int, status: MemberStatus) -> None:
+        counter = self._get(chat_id)
+        field = BAN_FIELDS[status]
+        setattr(counter, field, getattr(counter, field) + 1)
+
+
+class RedisJoinCounters:
+    def __init__(self, redis, prefix: str, ttl: int = 2 * 24 * 60 * 60) -> None:
+        self.redis = redis
+        self.prefix = prefix
+        self.ttl = ttl
+
+    def _key(self, chat_id: int, day: date = None) -> str:
+        return f"{self.prefix}:join_counters:{(day or date.today()).isoformat()}:{chat_id}"
+
+    async def load(self, session: AsyncSession) -> None:
+        today = date.today()
+
+        async with self.redis.pipeline(transaction=False) as pipeline:
+            for stats in await get_chat_daily_stats(session, today):
+                key = self._key(stats.chat_id, today)
+                pipeline.hsetnx(key, "total", stats.total)
+                pipeline.hsetnx(key, "ban_by_join", stats.ban_by_join)
+                pipeline.hsetnx(key, "ban_by_filter", stats.ban_by_filter)
+                pipeline.expire(key, self.ttl)
+
+            await pipeline.execute()
+
+    async def get(self, chat_id: int) -> DailyCounter:
+        total, ban_by_join, ban_by_filter = await self.redis.hmget(
+            self._key(chat_id), "total", "ban_by_join", "ban_by_filter"
+        )
+        return DailyCounter(total=int(total or 0), ban_by_join=int(ban_by_join or 0), ban_by_filter=int(ban_by_filter or 0))
+
+    async def _increment(self, chat_id: int, field: str) -> int:
+        key = self._key(chat_id)
+
+        async with self.redis.pipeline(transaction=True) as pipeline:
+            pipeline.hincrby(key, field, 1)
+            pipeline.expire(key, self.ttl)
+            value, _ = await pipeline.execute()
+
+        return value
+
+    async def add_join(self, chat_id: int) -> int:
+        return await self._increment(chat_id, "total")
+
+    async def add_ban(self, chat_id: int, status: MemberStatus) -> None:
+        await self._increment(chat_id, BAN_FIELDS[status])
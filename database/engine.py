@@ -1,16 +1,145 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+import logging
+import time
+from typing import Any, Dict
+
+from sqlalchemy import event, make_url, text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker, AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from database.migrations import upgrade
 from database.models import Base
 
 from config_reader import config
+from services.metrics import QUERY_LATENCY
+
+
+logger = logging.getLogger(__name__)
+
+DIALECT_DEFAULTS: Dict[str, Dict[str, Any]] = {
+    "sqlite": {
+        "pool_size": 5,
+        "max_overflow": 5,
+        "pool_pre_ping": False,
+        "pool_recycle": -1,
+        "statement_cache_size": 128,
+        "statement_timeout": 30.0,
+    },
+    "postgresql": {
+        "pool_size": 10,
+        "max_overflow": 20,
+        "pool_pre_ping": True,
+        "pool_recycle": 1800,
+        "statement_cache_size": 100,
+        "statement_timeout": 30.0,
+    },
+}
+
+
+def is_sqlite_file(database_url: str) -> bool:
+    url = make_url(database_url)
+    return url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:")
+
+
+def get_engine_options(database_url: str) -> Dict[str, Any]:
+    url = make_url(database_url)
+    dialect_name = url.get_backend_name()
+    defaults = DIALECT_DEFAULTS.get(dialect_name, {})
+
+    def get_option(name: str) -> Any:
+        value = getattr(config, f"database_{name}")
+        return defaults.get(name) if value is None else value
+
+    options: Dict[str, Any] = {"echo": config.database_echo}
+
+    if dialect_name == "sqlite" and not is_sqlite_file(database_url):
+        return options
+
+    connect_args: Dict[str, Any] = {}
+    statement_cache_size = get_option("statement_cache_size")
+    statement_timeout = get_option("statement_timeout")
+
+    if dialect_name == "sqlite":
+        # aiosqlite defaults to NullPool and opens a new connection thread per session
+        options["poolclass"] = AsyncAdaptedQueuePool
+
+        if statement_cache_size is not None:
+            connect_args["cached_statements"] = statement_cache_size
+
+        if statement_timeout is not None:
+            connect_args["timeout"] = statement_timeout
+
+    elif url.get_driver_name() == "asyncpg":
+        if statement_cache_size is not None:
+            connect_args["prepared_statement_cache_size"] = statement_cache_size
 
+        if statement_timeout is not None:
+            connect_args["server_settings"] = {"statement_timeout": str(int(statement_timeout * 1000))}
+
+    for name in ("pool_size", "max_overflow", "pool_pre_ping", "pool_recycle"):
+        value = get_option(name)
+        if value is not None:
+            options[name] = value
+
+    if connect_args:
+        options["connect_args"] = connect_args
+
+    return options
+
+
+def instrument_engine(async_engine: AsyncEngine) -> None:
+    @event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+        connection.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+    @event.listens_for(async_engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+        started_at = connection.info["query_started_at"].pop()
+        statement_type = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "UNKNOWN"
+        QUERY_LATENCY.observe(time.perf_counter() - started_at, statement_type)
+
+    @event.listens_for(async_engine.sync_engine, "handle_error")
+    def handle_error(exception_context):
+        if exception_context.connection is not None:
+            exception_context.connection.info.get("query_started_at", []).clear()
+
+
+def set_sqlite_pragmas(async_engine: AsyncEngine) -> None:
+    @event.listens_for(async_engine.sync_engine, "connect")
+    def connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+
+engine = create_async_engine(config.database_url, **get_engine_options(config.database_url))
+instrument_engine(engine)
+
+if is_sqlite_file(config.database_url):
+    set_sqlite_pragmas(engine)
 
-engine = create_async_engine(config.database_url, echo=True)
 session_maker = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
 
 
-async def create_db():
+async def migrate_db() -> int:
     async with engine.begin() as connection:
-        await connection.run_sync(Base.metadata.create_all)
+        return await connection.run_sync(upgrade)
+
+
+async def check_db() -> float:
+    started_at = time.perf_counter()
+
+    async with engine.connect() as connection:
+        await connection.execute(text("SELECT 1"))
+
+    latency = time.perf_counter() - started_at
+    logger.info(
+        "Database %s+%s is available in %.1f ms, pool: %s",
+        engine.dialect.name,
+        engine.dialect.driver,
+        latency * 1000,
+        engine.pool.status()
+    )
+    return latency
 
 
 async def drop_db():
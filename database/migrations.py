@@ -0,0 +1,92 @@
+import logging
+from typing import Callable, List
+
+from sqlalchemy import Connection, Index, Table, delete, func, insert, inspect, select, text
+
+from database.models import Base, Chat, Member, MemberStatus, SchemaVersion, ChatDailyStats, BlockedUser
+from database.orm_queries import build_member_stats_query
+
+
+logger = logging.getLogger(__name__)
+
+Migration = Callable[[Connection], None]
+
+
+def _get_index(table: Table, name: str) -> Index:
+    return next(index for index in table.indexes if index.name == name)
+
+
+def add_lookup_indexes(connection: Connection) -> None:
+    latest_members = select(func.max(Member.id)).group_by(Member.chat_id, Member.telegram_id)
+    connection.execute(delete(Member).where(Member.id.not_in(latest_members)))
+
+    _get_index(Chat.__table__, "ix_chat_telegram_id").create(connection, checkfirst=True)
+    _get_index(Member.__table__, "ix_member_chat_id_telegram_id").create(connection, checkfirst=True)
+    _get_index(Member.__table__, "ix_member_chat_id_status_updated_at").create(connection, checkfirst=True)
+
+
+def add_chat_filter_profile(connection: Connection) -> None:
+    connection.execute(text("ALTER TABLE chat ADD COLUMN filter_profile VARCHAR(50) DEFAULT 'default' NOT NULL"))
+
+
+def add_chat_daily_stats(connection: Connection) -> None:
+    ChatDailyStats.__table__.create(connection, checkfirst=True)
+
+    stats = [
+        {"chat_id": chat_id, "day": day, "total": total, "ban_by_join": ban_by_join, "ban_by_filter": ban_by_filter}
+        for chat_id, day, total, ban_by_join, ban_by_filter in connection.execute(build_member_stats_query())
+    ]
+    if stats:
+        connection.execute(insert(ChatDailyStats), stats)
+
+
+def add_chat_pagination_index(connection: Connection) -> None:
+    _get_index(Chat.__table__, "ix_chat_created_at_id").create(connection, checkfirst=True)
+
+
+def add_blocklist(connection: Connection) -> None:
+    BlockedUser.__table__.create(connection, checkfirst=True)
+    connection.execute(text("ALTER TABLE chat ADD COLUMN use_blocklist BOOLEAN DEFAULT TRUE NOT NULL"))
+
+
+def delete_join_limit_blocklist_entries(connection: Connection) -> None:
+    # limit and raid bans were both stored as ban_by_join, only filter and manual entries stay permanent
+    connection.execute(delete(BlockedUser).where(BlockedUser.reason == MemberStatus.BAN_BY_JOIN.value))
+
+
+MIGRATIONS: List[Migration] = [
+    add_lookup_indexes,
+    add_chat_filter_profile,
+    add_chat_daily_stats,
+    add_chat_pagination_index,
+    add_blocklist,
+    delete_join_limit_blocklist_entries,
+]
+
+
+def get_schema_version(connection: Connection) -> int:
+    if not inspect(connection).has_table(SchemaVersion.__tablename__):
+        return 0
+
+    return connection.scalar(select(func.max(SchemaVersion.version))) or 0
+
+
+def upgrade(connection: Connection) -> int:
+    latest_version = len(MIGRATIONS)
+
+    if not inspect(connection).has_table(Chat.__tablename__):
+        Base.metadata.create_all(connection)
+        connection.execute(insert(SchemaVersion).values(version=latest_version))
+        logger.info("Created database schema version %s", latest_version)
+        return latest_version
+
+    SchemaVersion.__table__.create(connection, checkfirst=True)
+    current_version = get_schema_version(connection)
+
+    for version in range(current_version + 1, latest_version + 1):
+        migration = MIGRATIONS[version - 1]
+        migration(connection)
+        connection.execute(insert(SchemaVersion).values(version=version))
+        logger.info("Applied database migration %s: %s", version, migration.__name__)
+
+    return latest_version
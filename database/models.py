@@ -1,16 +1,35 @@
-from datetime import datetime
+from datetime import datetime, date
+from enum import Enum
 
-from sqlalchemy import String, DateTime, Boolean, ForeignKey, Integer, Text
+from sqlalchemy import String, DateTime, Boolean, ForeignKey, Integer, Text, Index, Date, BigInteger, true
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
+class MemberStatus(Enum):
+    JOIN = "join"
+    LEAVE = "leave"
+    BAN_BY_JOIN = "ban_by_join"
+    BAN_BY_RAID = "ban_by_raid"
+    BAN_BY_FILTER = "ban_by_filter"
+
+
 class Base(DeclarativeBase):
     created_at: Mapped[DateTime] = mapped_column(DateTime, default=datetime.now)
     updated_at: Mapped[DateTime] = mapped_column(DateTime, default=datetime.now, onupdate=datetime.now)
 
 
+class SchemaVersion(Base):
+    __tablename__ = "schema_version"
+
+    version: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+
+
 class Chat(Base):
     __tablename__ = "chat"
+    __table_args__ = (
+        Index("ix_chat_telegram_id", "telegram_id", unique=True),
+        Index("ix_chat_created_at_id", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     telegram_id: Mapped[str] = mapped_column(nullable=False)
@@ -18,16 +37,27 @@ class Chat(Base):
     username: Mapped[str] = mapped_column(String(255), nullable=True)
     allowed_members: Mapped[int] = mapped_column(Integer, default=200, nullable=False)
     arab_filter_flag: Mapped[Boolean] = mapped_column(Boolean, default=True, nullable=False)
+    filter_profile: Mapped[str] = mapped_column(String(50), default="default", server_default="default", nullable=False)
+    use_blocklist: Mapped[bool] = mapped_column(Boolean, default=True, server_default=true(), nullable=False)
 
     members: Mapped[list["Member"]] = relationship(
         "Member",
         back_populates="chat",
         cascade="all, delete-orphan"
     )
+    daily_stats: Mapped[list["ChatDailyStats"]] = relationship(
+        "ChatDailyStats",
+        back_populates="chat",
+        cascade="all, delete-orphan"
+    )
 
 
 class Member(Base):
     __tablename__ = "member"
+    __table_args__ = (
+        Index("ix_member_chat_id_telegram_id", "chat_id", "telegram_id", unique=True),
+        Index("ix_member_chat_id_status_updated_at", "chat_id", "status", "updated_at"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     telegram_id: Mapped[str] = mapped_column(nullable=False)
@@ -41,7 +71,27 @@ class Member(Base):
     chat: Mapped["Chat"] = relationship("Chat", back_populates="members")
 
 
+class ChatDailyStats(Base):
+    __tablename__ = "chat_daily_stats"
+
+    chat_id: Mapped[int] = mapped_column(ForeignKey("chat.id", ondelete="CASCADE"), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    total: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    ban_by_join: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    ban_by_filter: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    chat: Mapped["Chat"] = relationship("Chat", back_populates="daily_stats")
+
+
 class DefaultMessage(Base):
     __tablename__ = "default_message"
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     text: Mapped[str] = mapped_column(Text, nullable=False)
+
+
+class BlockedUser(Base):
+    __tablename__ = "blocked_user"
+
+    telegram_id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=False)
+    reason: Mapped[str] = mapped_column(String(50), nullable=False)
+    chat_id: Mapped[int] = mapped_column(Integer, nullable=True)
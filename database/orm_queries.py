@@ -1,10 +1,12 @@
-from datetime import datetime, timedelta
-from typing import Sequence, List
+from datetime import datetime, date, timedelta
+from typing import Sequence, Optional, Tuple, Dict, Any, List, AsyncIterator
 
-from sqlalchemy import select, func
+from sqlalchemy import select, func, case, and_, or_, delete, Date, Select, Insert, Row
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from database.models import Chat, DefaultMessage, Member
+from database.cache import chat_cache, default_message_cache, MISSING
+from database.models import Chat, DefaultMessage, Member, MemberStatus, ChatDailyStats
 
 
 async def find_chat_by_telegram_id(session: AsyncSession, telegram_id: str) -> Chat:
@@ -25,12 +27,14 @@ async def add_chat(session: AsyncSession, telegram_id: str, title: str, username
     chat = Chat(telegram_id=telegram_id, title=title, username=username)
     session.add(chat)
     await session.commit()
+    chat_cache.put(chat)
     return chat
 
 
 async def set_chat_title(session: AsyncSession, chat: Chat, title: str) -> Chat:
     chat.title = title
     await session.commit()
+    chat_cache.put(chat)
     return chat
 
 
@@ -41,21 +45,80 @@ async def get_all_chats(session: AsyncSession) -> Sequence[Chat]:
     return all_chats
 
 
+async def load_chat_cache(session: AsyncSession) -> int:
+    chats = await get_all_chats(session)
+    for chat in chats:
+        chat_cache.put(chat)
+
+    return len(chats)
+
+
+async def count_chats(session: AsyncSession) -> int:
+    query = select(func.count(Chat.id))
+    result = await session.execute(query)
+    return result.scalar_one()
+
+
+async def get_chats_page(
+        session: AsyncSession,
+        limit: int,
+        cursor: Optional[Tuple[datetime, int]] = None,
+        backward: bool = False
+) -> Sequence[Row[Tuple[int, str, datetime]]]:
+    query = select(Chat.id, Chat.title, Chat.created_at)
+
+    if cursor:
+        created_at, _id = cursor
+
+        if backward:
+            query = query.where(or_(Chat.created_at > created_at, and_(Chat.created_at == created_at, Chat.id > _id)))
+
+        else:
+            query = query.where(or_(Chat.created_at < created_at, and_(Chat.created_at == created_at, Chat.id < _id)))
+
+    if backward:
+        query = query.order_by(Chat.created_at.asc(), Chat.id.asc())
+
+    else:
+        query = query.order_by(Chat.created_at.desc(), Chat.id.desc())
+
+    result = await session.execute(query.limit(limit))
+    chats = result.all()
+    return chats[::-1] if backward else chats
+
+
 async def set_chat_allowed_members(session: AsyncSession, chat: Chat, allowed_members: int) -> Chat:
     chat.allowed_members = allowed_members
     await session.commit()
+    chat_cache.put(chat)
     return chat
 
 
 async def set_chat_arab_filter_flag(session: AsyncSession, chat: Chat, arab_filter_flag: bool) -> Chat:
     chat.arab_filter_flag = arab_filter_flag
     await session.commit()
+    chat_cache.put(chat)
+    return chat
+
+
+async def set_chat_filter_profile(session: AsyncSession, chat: Chat, filter_profile: str) -> Chat:
+    chat.filter_profile = filter_profile
+    await session.commit()
+    chat_cache.put(chat)
+    return chat
+
+
+async def set_chat_use_blocklist(session: AsyncSession, chat: Chat, use_blocklist: bool) -> Chat:
+    chat.use_blocklist = use_blocklist
+    await session.commit()
+    chat_cache.put(chat)
     return chat
 
 
 async def delete_chat(session: AsyncSession, chat: Chat):
     await session.delete(chat)
     await session.commit()
+    chat_cache.put_missing(chat.telegram_id)
 
 
 async def get_default_message_latest(session: AsyncSession) -> DefaultMessage:
@@ -65,63 +128,305 @@ async def get_default_message_latest(session: AsyncSession) -> DefaultMessage:
     return default_message
 
 
+async def get_default_message_text(session: AsyncSession) -> Optional[str]:
+    text = default_message_cache.get()
+    if text is not MISSING:
+        return text
+
+    default_message = await get_default_message_latest(session)
+    text = default_message.text if default_message else None
+    default_message_cache.put(text)
+    return text
+
+
 async def add_default_message(session: AsyncSession, text: str) -> DefaultMessage:
     default_message = DefaultMessage(text=text)
     session.add(default_message)
     await session.commit()
+    default_message_cache.put(text)
     return default_message
 
 
-async def add_member(
-        session: AsyncSession,
+UPSERT_DIALECTS = {
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert
+}
+
+CHAT_CHUNK_SIZE = 500
+
+# raid bans are counted together with join limit bans in the daily stats
+JOIN_BAN_STATUSES = [MemberStatus.BAN_BY_JOIN.value, MemberStatus.BAN_BY_RAID.value]
+JOINED_STATUSES = [MemberStatus.JOIN.value, *JOIN_BAN_STATUSES, MemberStatus.BAN_BY_FILTER.value]
+
+
+def build_member_upsert(dialect_name: str, members: Optional[List[Dict[str, Any]]] = None) -> Insert:
+    query = UPSERT_DIALECTS[dialect_name](Member)
+    if members is not None:
+        query = query.values(members)
+
+    return query.on_conflict_do_update(
+        index_elements=[Member.chat_id, Member.telegram_id],
+        set_={
+            "username": query.excluded.username,
+            "first_name": query.excluded.first_name,
+            "last_name": query.excluded.last_name,
+            "is_premium": query.excluded.is_premium,
+            "status": query.excluded.status,
+            "updated_at": query.excluded.updated_at
+        }
+    )
+
+
+def build_chat_daily_stats_increment(dialect_name: str, stats: Optional[List[Dict[str, Any]]] = None) -> Insert:
+    query = UPSERT_DIALECTS[dialect_name](ChatDailyStats)
+    if stats is not None:
+        query = query.values(stats)
+
+    return query.on_conflict_do_update(
+        index_elements=[ChatDailyStats.chat_id, ChatDailyStats.day],
+        set_={
+            "total": ChatDailyStats.total + query.excluded.total,
+            "ban_by_join": ChatDailyStats.ban_by_join + query.excluded.ban_by_join,
+            "ban_by_filter": ChatDailyStats.ban_by_filter + query.excluded.ban_by_filter,
+            "updated_at": query.excluded.updated_at
+        }
+    )
+
+
+def chunked(values: Sequence[Any], size: int) -> List[Sequence[Any]]:
+    return [values[index:index + size] for index in range(0, len(values), size)]
+
+
+async def find_chats_by_telegram_ids(session: AsyncSession, telegram_ids: Sequence[str]) -> Dict[str, Chat]:
+    chats = {}
+    for telegram_ids_chunk in chunked(telegram_ids, CHAT_CHUNK_SIZE):
+        result = await session.execute(select(Chat).where(Chat.telegram_id.in_(telegram_ids_chunk)))
+        chats.update((chat.telegram_id, chat) for chat in result.scalars())
+
+    return chats
+
+
+def build_chat_upsert(dialect_name: str, chats: Sequence[Dict[str, Any]]) -> Insert:
+    query = UPSERT_DIALECTS[dialect_name](Chat).values(list(chats))
+    return query.on_conflict_do_update(
+        index_elements=[Chat.telegram_id],
+        set_={
+            "title": query.excluded.title,
+            "username": query.excluded.username,
+            "allowed_members": query.excluded.allowed_members,
+            "arab_filter_flag": query.excluded.arab_filter_flag,
+            "filter_profile": query.excluded.filter_profile,
+            "use_blocklist": query.excluded.use_blocklist,
+            "updated_at": query.excluded.updated_at
+        }
+    )
+
+
+async def upsert_chats(session: AsyncSession, chats: Sequence[Dict[str, Any]]) -> None:
+    dialect_name = session.bind.dialect.name
+    now = datetime.now()
+    values = [{**chat, "created_at": now, "updated_at": now} for chat in chats]
+
+    for values_chunk in chunked(values, CHAT_CHUNK_SIZE):
+        await session.execute(build_chat_upsert(dialect_name, values_chunk))
+
+    await session.commit()
+
+    session.expire_all()
+    for chat in (await find_chats_by_telegram_ids(session, [chat["telegram_id"] for chat in chats])).values():
+        chat_cache.put(chat)
+
+
+def get_member_values(
         telegram_id: str,
         chat_id: int,
         username: str = None,
         first_name: str = None,
         last_name: str = None,
         is_premium: bool = None,
-        status: str = None
-) -> Member:
-    member = Member(
-        telegram_id=telegram_id,
-        chat_id=chat_id,
-        username=username,
-        first_name=first_name,
-        last_name=last_name,
-        is_premium=is_premium,
-        status=status
-    )
+        status: str = None,
+        now: datetime = None
+) -> Dict[str, Any]:
+    now = now or datetime.now()
+    return {
+        "telegram_id": telegram_id,
+        "chat_id": chat_id,
+        "username": username,
+        "first_name": first_name,
+        "last_name": last_name,
+        "is_premium": is_premium,
+        "status": status,
+        "created_at": now,
+        "updated_at": now
+    }
 
-    session.add(member)
-    await session.commit()
-    return member
 
+def get_chat_daily_stats_values(chat_id: int, status: str, now: datetime = None) -> Dict[str, Any]:
+    now = now or datetime.now()
+    return {
+        "chat_id": chat_id,
+        "day": now.date(),
+        "total": 1,
+        "ban_by_join": int(status in JOIN_BAN_STATUSES),
+        "ban_by_filter": int(status == MemberStatus.BAN_BY_FILTER.value),
+        "created_at": now,
+        "updated_at": now
+    }
+
+
+def collapse_member_statuses(
+        members: List[Dict[str, Any]]
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    latest_members: Dict[Tuple[int, str], Dict[str, Any]] = {}
+    stats: Dict[Tuple[int, date], Dict[str, Any]] = {}
+
+    for member in members:
+        latest_members[(member["chat_id"], member["telegram_id"])] = member
+
+        if member["status"] not in JOINED_STATUSES:
+            continue
+
+        values = get_chat_daily_stats_values(member["chat_id"], member["status"], member["updated_at"])
+        key = (values["chat_id"], values["day"])
+
+        if key not in stats:
+            stats[key] = values
+            continue
+
+        for field in ("total", "ban_by_join", "ban_by_filter"):
+            stats[key][field] += values[field]
+
+        stats[key]["updated_at"] = values["updated_at"]
+
+    return list(latest_members.values()), list(stats.values())
+
+
+async def record_member_statuses(session: AsyncSession, members: List[Dict[str, Any]]) -> None:
+    dialect_name = session.bind.dialect.name
+    latest_members, stats = collapse_member_statuses(members)
+
+    await session.execute(build_member_upsert(dialect_name, latest_members))
+
+    if stats:
+        await session.execute(build_chat_daily_stats_increment(dialect_name, stats))
 
-async def set_member_status(session: AsyncSession, member: Member, status: str) -> Member:
-    member.status = status
     await session.commit()
-    return member
 
 
-async def find_member_by_telegram_id_and_chat_id(session: AsyncSession, telegram_id: str, chat_id: int) -> Member:
-    query = select(Member).where(Member.telegram_id == telegram_id, Member.chat_id == chat_id)
-    result = await session.execute(query)
-    member = result.scalars().first()
-    return member
+def build_member_events_query(chat_id: int, start: datetime, end: datetime) -> Select:
+    return (
+        select(
+            Member.telegram_id,
+            Member.username,
+            Member.first_name,
+            Member.last_name,
+            Member.is_premium,
+            Member.status,
+            Member.created_at,
+            Member.updated_at
+        )
+        .where(Member.chat_id == chat_id, Member.updated_at >= start, Member.updated_at < end)
+        .order_by(Member.updated_at, Member.id)
+    )
 
 
-async def count_members(session: AsyncSession, chat_id: int, status: List[str]) -> int:
-    today_start = datetime.combine(datetime.today(), datetime.min.time())
-    tomorrow_start = today_start + timedelta(days=1)
+async def stream_member_events(
+        session: AsyncSession,
+        chat_id: int,
+        start: datetime,
+        end: datetime,
+        batch_size: int = 1000
+) -> AsyncIterator[Sequence[Row]]:
+    query = build_member_events_query(chat_id, start, end).execution_options(yield_per=batch_size)
+    result = await session.stream(query)
+
+    async for rows in result.partitions():
+        yield rows
+
+
+def build_member_stats_query(start: datetime = None, end: datetime = None) -> Select:
+    day = func.date(Member.updated_at, type_=Date)
 
     query = (
-        select(func.count(Member.id))
-        .where(
-            Member.chat_id == chat_id,
-            Member.status.in_(status),
-            Member.updated_at >= today_start,
-            Member.updated_at < tomorrow_start
+        select(
+            Member.chat_id,
+            day,
+            func.count(Member.id),
+            func.sum(case((Member.status.in_(JOIN_BAN_STATUSES), 1), else_=0)),
+            func.sum(case((Member.status == MemberStatus.BAN_BY_FILTER.value, 1), else_=0))
         )
+        .where(Member.status.in_(JOINED_STATUSES))
+        .group_by(Member.chat_id, day)
+    )
+
+    if start is not None:
+        query = query.where(Member.updated_at >= start)
+
+    if end is not None:
+        query = query.where(Member.updated_at < end)
+
+    return query
+
+
+async def get_chat_daily_stats(session: AsyncSession, day: date) -> Sequence[ChatDailyStats]:
+    query = select(ChatDailyStats).where(ChatDailyStats.day == day)
+    result = await session.execute(query)
+    return result.scalars().all()
+
+
+async def get_chat_stats_totals(
+        session: AsyncSession,
+        chat_id: int,
+        periods: Sequence[int]
+) -> Dict[int, Tuple[int, int, int]]:
+    today = date.today()
+    starts = {days: today - timedelta(days=days - 1) for days in periods}
+
+    columns = []
+    for start in starts.values():
+        in_period = ChatDailyStats.day >= start
+        columns.extend([
+            func.coalesce(func.sum(case((in_period, ChatDailyStats.total), else_=0)), 0),
+            func.coalesce(func.sum(case((in_period, ChatDailyStats.ban_by_join), else_=0)), 0),
+            func.coalesce(func.sum(case((in_period, ChatDailyStats.ban_by_filter), else_=0)), 0)
+        ])
+
+    query = select(*columns).where(
+        ChatDailyStats.chat_id == chat_id,
+        ChatDailyStats.day >= min(starts.values())
     )
     result = await session.execute(query)
-    return result.scalar_one()
+    row = result.one()
+
+    return {days: tuple(row[index * 3:index * 3 + 3]) for index, days in enumerate(starts)}
+
+
+async def add_missing_chat_daily_stats(session: AsyncSession, end: datetime) -> int:
+    now = datetime.now()
+    result = await session.execute(build_member_stats_query(end=end))
+    stats = [
+        {
+            "chat_id": chat_id,
+            "day": day,
+            "total": total,
+            "ban_by_join": ban_by_join,
+            "ban_by_filter": ban_by_filter,
+            "created_at": now,
+            "updated_at": now
+        }
+        for chat_id, day, total, ban_by_join, ban_by_filter in result
+    ]
+
+    if stats:
+        query = UPSERT_DIALECTS[session.bind.dialect.name](ChatDailyStats).values(stats)
+        await session.execute(query.on_conflict_do_nothing(index_elements=[ChatDailyStats.chat_id, ChatDailyStats.day]))
+        await session.commit()
+
+    return len(stats)
+
+
+async def delete_members_before(session: AsyncSession, end: datetime, limit: int) -> int:
+    old_members = select(Member.id).where(Member.updated_at < end).order_by(Member.id).limit(limit)
+    result = await session.execute(delete(Member).where(Member.id.in_(old_members.scalar_subquery())))
+    await session.commit()
+    return result.rowcount
@@ -1,36 +1,55 @@
 import math
+import os
 from contextlib import suppress
+from datetime import datetime, timedelta
 from html import escape
+from typing import Optional
 
 from aiogram import Router, F, html
 from aiogram.enums import ParseMode
 from aiogram.exceptions import TelegramBadRequest
-from aiogram.filters import Command
+from aiogram.filters import Command, CommandObject
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import StatesGroup, State
-from aiogram.types import Message, CallbackQuery
+from aiogram.types import Message, CallbackQuery, BufferedInputFile, FSInputFile, InlineKeyboardMarkup
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from config_reader import config
 from database.models import Chat
 from database.orm_queries import find_chat_by_telegram_id, add_chat, set_chat_title, find_chat_by_id, \
-    set_chat_allowed_members, set_chat_arab_filter_flag, delete_chat, get_default_message_latest, add_default_message, \
-    get_all_chats, count_members
+    set_chat_allowed_members, set_chat_arab_filter_flag, set_chat_filter_profile, set_chat_use_blocklist, delete_chat, \
+    get_default_message_text, add_default_message, count_chats, get_chats_page, get_chat_stats_totals, get_all_chats
 from keyboards.admin import get_start_menu, get_chat_settings_menu, get_delete_request_menu, get_cancel_menu, \
-    get_all_chats_menu
+    get_all_chats_menu, get_export_request_menu
 from keyboards.admin import ChatSettingsCbData, SettingType, ChatInfoCbData, PaginationCbData
 from filters.chat_type import ChatTypeFilter, IsAdminFilter
+from services.blocklist import MANUAL_REASON, blocklist
+from services.chat_transfer import FILE_FORMATS, MAX_ALLOWED_MEMBERS, dump_chats, get_file_format, import_chats
+from services.member_export import export_member_events
+from services.name_filter import get_name_filter, get_next_filter_profile
+from services.raid_detector import raid_detector
+from services.state import join_counters
 
 router = Router()
 router.message.filter(ChatTypeFilter(is_group=False), IsAdminFilter())
 
 
+def get_chat_menu(chat: Chat) -> InlineKeyboardMarkup:
+    return get_chat_settings_menu(chat.id, bool(chat.arab_filter_flag), chat.filter_profile, bool(chat.use_blocklist))
+
+
 async def get_chat_info_text(session: AsyncSession, chat: Chat):
     title = f"<a href='https://t.me/{chat.username}'>{chat.title}</a>" if chat.username else chat.title
 
-    total = await count_members(session, chat.id, ["join", "ban_by_join", "ban_by_filter"])
-    ban_by_join = await count_members(session, chat.id, ["ban_by_join"])
-    ban_by_filter = await count_members(session, chat.id, ["ban_by_filter"])
+    counter = await join_counters.get(chat.id)
+    totals = await get_chat_stats_totals(session, chat.id, (7, 30))
+    period_stats = "\n".join(
+        f"За {days} дней: присоединилось {total}, по лимиту {ban_by_join}, по фильтру {ban_by_filter}"
+        for days, (total, ban_by_join, ban_by_filter) in totals.items()
+    )
+
+    raid_remaining = raid_detector.get_raid_remaining(chat.id)
+    raid_status = f"🚨 Режим рейда: ещё {math.ceil(raid_remaining / 60)} мин.\n" if raid_remaining else ""
 
     return (
         f"⭐️ ID: {chat.id}\n"
@@ -38,15 +57,20 @@ async def get_chat_info_text(session: AsyncSession, chat: Chat):
         f"✏️ Название: {title}\n"
         f"👥 Разрешено пользователей: {chat.allowed_members}\n"
         f"{'🟢' if chat.arab_filter_flag else '🔴'} Фильтр чурок: {'включен' if chat.arab_filter_flag else 'выключен'}\n"
-        f"📅 Дата добавления: {chat.created_at.strftime('%Y-%m-%d %H:%M')}\n\n"
+        f"🧹 Профиль фильтра: {get_name_filter(chat.filter_profile).rules.title}\n"
+        f"{'🟢' if chat.use_blocklist else '🔴'} Глобальный блоклист: {'включен' if chat.use_blocklist else 'выключен'}\n"
+        f"📅 Дата добавления: {chat.created_at.strftime('%Y-%m-%d %H:%M')}\n"
+        f"{raid_status}\n"
         f"{html.bold('📊 Статистика за день')}\n"
-        f"Всего присоединилось: {total}\n"
-        f"Заблокированы по лимиту: {ban_by_join}\n"
-        f"Заблокированы по фильтру: {ban_by_filter}"
+        f"Всего присоединилось: {counter.total}\n"
+        f"Заблокированы по лимиту: {counter.ban_by_join}\n"
+        f"Заблокированы по фильтру: {counter.ban_by_filter}\n\n"
+        f"{html.bold('📈 Статистика за период')}\n"
+        f"{period_stats}"
     )
 
 
-@router.message(Command("start"))
+@router.message(Command("start"), flags={"db": False})
 async def command_start(message: Message):
     await message.answer(
         "👋 Здравствуйте, админ!",
@@ -75,7 +99,7 @@ async def add_group_to_white_list(message: Message, session: AsyncSession):
 
         await message.answer(
             text=await get_chat_info_text(session, new_chat),
-            reply_markup=get_chat_settings_menu(new_chat.id, bool(new_chat.arab_filter_flag)),
+            reply_markup=get_chat_menu(new_chat),
             parse_mode=ParseMode.HTML,
             disable_web_page_preview=True
         )
@@ -83,9 +107,10 @@ async def add_group_to_white_list(message: Message, session: AsyncSession):
 
 @router.message(F.text.lower().contains("мои чаты"))
 async def get_white_list(message: Message, session: AsyncSession):
-    chats = await get_all_chats(session)
-    if chats:
-        await message.answer(f"Всего добавлено чатов: {len(chats)}", reply_markup=await get_all_chats_menu(chats))
+    total = await count_chats(session)
+    if total:
+        chats = await get_chats_page(session, config.page_limit)
+        await message.answer(f"Всего добавлено чатов: {total}", reply_markup=await get_all_chats_menu(chats, total))
 
     else:
         await message.answer("У вас нету добавленных чатов")
@@ -99,7 +124,7 @@ async def get_chat_info(callback: CallbackQuery, callback_data: ChatInfoCbData,
 
     await callback.message.edit_text(
         text=await get_chat_info_text(session, found_chat),
-        reply_markup=get_chat_settings_menu(found_chat.id, bool(found_chat.arab_filter_flag)),
+        reply_markup=get_chat_menu(found_chat),
         parse_mode=ParseMode.HTML,
         disable_web_page_preview=True
     )
@@ -109,19 +134,30 @@ async def get_chat_info(callback: CallbackQuery, callback_data: ChatInfoCbData,
 @router.callback_query(PaginationCbData.filter())
 async def make_pagination(callback: CallbackQuery, callback_data: PaginationCbData, session: AsyncSession):
     page = callback_data.page
+    cursor = callback_data.get_cursor()
     limit = config.page_limit
-    chats = await get_all_chats(session)
+    total = await count_chats(session)
 
-    if chats:
-        max_page = math.ceil(len(chats) / limit) - 1
+    if total:
+        max_page = math.ceil(total / limit) - 1
         if page > max_page or page < 0:
             await callback.answer("Такой страницы не существует")
+            page, cursor = 0, None
+
+        if page == max_page and cursor is None and callback_data.backward:
+            chats = await get_chats_page(session, total - max_page * limit, backward=True)
+
+        else:
+            chats = await get_chats_page(session, limit, cursor, callback_data.backward and cursor is not None)
+
+        if not chats:
             page = 0
+            chats = await get_chats_page(session, limit)
 
         with suppress(TelegramBadRequest):
             await callback.message.edit_text(
-                f"Всего добавлено чатов: {len(chats)}",
-                reply_markup=await get_all_chats_menu(chats, page=page))
+                f"Всего добавлено чатов: {total}",
+                reply_markup=await get_all_chats_menu(chats, total, page=page))
 
     else:
         await callback.message.edit_text("У вас нету добавленных чатов")
@@ -141,7 +177,7 @@ async def change_allowed_members(callback: CallbackQuery, callback_data: ChatSet
     if new_allowed_members < 0:
         return await callback.answer("Установлено минимальное значение")
 
-    elif new_allowed_members > 1000:
+    elif new_allowed_members > MAX_ALLOWED_MEMBERS:
         return await callback.answer("Установлено максимальное значение")
 
     found_chat = await set_chat_allowed_members(session, found_chat, new_allowed_members)
@@ -149,7 +185,7 @@ async def change_allowed_members(callback: CallbackQuery, callback_data: ChatSet
     with suppress(TelegramBadRequest):
         await callback.message.edit_text(
             text=await get_chat_info_text(session, found_chat),
-            reply_markup=get_chat_settings_menu(found_chat.id, bool(found_chat.arab_filter_flag)),
+            reply_markup=get_chat_menu(found_chat),
             parse_mode=ParseMode.HTML,
             disable_web_page_preview=True
         )
@@ -171,13 +207,86 @@ async def change_arab_filter_flag(callback: CallbackQuery, callback_data: ChatSe
 
     await callback.message.edit_text(
         text=await get_chat_info_text(session, found_chat),
-        reply_markup=get_chat_settings_menu(found_chat.id, bool(found_chat.arab_filter_flag)),
+        reply_markup=get_chat_menu(found_chat),
         parse_mode=ParseMode.HTML,
         disable_web_page_preview=True
     )
     await callback.answer()
 
 
+@router.callback_query(ChatSettingsCbData.filter(F.setting_type == SettingType.filter_profile))
+async def change_filter_profile(callback: CallbackQuery, callback_data: ChatSettingsCbData, session: AsyncSession):
+    found_chat = await find_chat_by_id(session, callback_data.chat_id)
+
+    if not found_chat:
+        return await callback.answer("Чат не найден")
+
+    found_chat = await set_chat_filter_profile(session, found_chat, get_next_filter_profile(found_chat.filter_profile))
+
+    with suppress(TelegramBadRequest):
+        await callback.message.edit_text(
+            text=await get_chat_info_text(session, found_chat),
+            reply_markup=get_chat_menu(found_chat),
+            parse_mode=ParseMode.HTML,
+            disable_web_page_preview=True
+        )
+    await callback.answer()
+
+
+@router.callback_query(ChatSettingsCbData.filter(F.setting_type == SettingType.use_blocklist))
+async def change_use_blocklist(callback: CallbackQuery, callback_data: ChatSettingsCbData, session: AsyncSession):
+    found_chat = await find_chat_by_id(session, callback_data.chat_id)
+
+    if not found_chat:
+        return await callback.answer("Чат не найден")
+
+    found_chat = await set_chat_use_blocklist(session, found_chat, not found_chat.use_blocklist)
+
+    with suppress(TelegramBadRequest):
+        await callback.message.edit_text(
+            text=await get_chat_info_text(session, found_chat),
+            reply_markup=get_chat_menu(found_chat),
+            parse_mode=ParseMode.HTML,
+            disable_web_page_preview=True
+        )
+    await callback.answer()
+
+
+@router.callback_query(ChatSettingsCbData.filter(F.setting_type == SettingType.export_request))
+async def make_export_request(callback: CallbackQuery, callback_data: ChatSettingsCbData, session: AsyncSession):
+    found_chat = await find_chat_by_id(session, callback_data.chat_id)
+
+    if not found_chat:
+        return await callback.answer("Чат не найден")
+
+    await callback.message.edit_reply_markup(reply_markup=get_export_request_menu(found_chat.id))
+    await callback.answer("Выберите период")
+
+
+@router.callback_query(ChatSettingsCbData.filter(F.setting_type == SettingType.export_submit))
+async def make_export_submit(callback: CallbackQuery, callback_data: ChatSettingsCbData, session: AsyncSession):
+    found_chat = await find_chat_by_id(session, callback_data.chat_id)
+
+    if not found_chat:
+        return await callback.answer("Чат не найден")
+
+    await callback.answer("Готовлю выгрузку")
+
+    end = datetime.now()
+    start = end - timedelta(days=callback_data.value)
+    path, exported = await export_member_events(session, found_chat.id, start, end)
+
+    try:
+        await callback.message.answer_document(
+            FSInputFile(path, filename=f"members_{found_chat.telegram_id}_{start:%Y%m%d}_{end:%Y%m%d}.csv"),
+            caption=f"События чата {html.bold(escape(found_chat.title))} за {callback_data.value} дн.: {exported}",
+            parse_mode=ParseMode.HTML
+        )
+
+    finally:
+        os.remove(path)
+
+
 @router.callback_query(ChatSettingsCbData.filter(F.setting_type == SettingType.delete_request))
 async def make_delete_request(callback: CallbackQuery, callback_data: ChatSettingsCbData, session: AsyncSession):
     found_chat = await find_chat_by_id(session, callback_data.chat_id)
@@ -208,7 +317,7 @@ async def make_delete_submit(callback: CallbackQuery, callback_data: ChatSetting
     await callback.answer()
 
 
-@router.callback_query(ChatSettingsCbData.filter(F.setting_type == SettingType.delete_cancel))
+@router.callback_query(ChatSettingsCbData.filter(F.setting_type.in_({SettingType.delete_cancel, SettingType.export_cancel})))
 async def make_delete_cancel(callback: CallbackQuery, callback_data: ChatSettingsCbData, session: AsyncSession):
     found_chat = await find_chat_by_id(session, callback_data.chat_id)
 
@@ -218,7 +327,7 @@ async def make_delete_cancel(callback: CallbackQuery, callback_data: ChatSetting
     with suppress(TelegramBadRequest):
         await callback.message.edit_text(
             text=await get_chat_info_text(session, found_chat),
-            reply_markup=get_chat_settings_menu(found_chat.id, bool(found_chat.arab_filter_flag)),
+            reply_markup=get_chat_menu(found_chat),
             parse_mode=ParseMode.HTML,
             disable_web_page_preview=True
         )
@@ -231,17 +340,17 @@ class SetDefaultMessage(StatesGroup):
 
 @router.message(F.text.lower().contains("дефолтное сообщение"))
 async def set_default_message_request(message: Message, session: AsyncSession, state: FSMContext):
-    latest_default_message = await get_default_message_latest(session)
+    latest_default_message_text = await get_default_message_text(session)
     await message.answer(
         f"{html.bold('Текущее сообщение')}\n\n"
-        f"{escape(latest_default_message.text) if latest_default_message else 'Не установлено'}",
+        f"{escape(latest_default_message_text) if latest_default_message_text else 'Не установлено'}",
         parse_mode=ParseMode.HTML
     )
     await message.answer(f"Отправьте мне новое сообщение", reply_markup=get_cancel_menu())
     await state.set_state(SetDefaultMessage.setting_new_default_message)
 
 
-@router.message(SetDefaultMessage.setting_new_default_message, F.text.lower().contains("отменить"))
+@router.message(SetDefaultMessage.setting_new_default_message, F.text.lower().contains("отменить"), flags={"db": False})
 async def set_default_message_cancel(message: Message, state: FSMContext):
     await message.answer(text="Действие отменено", reply_markup=get_start_menu())
     await state.clear()
@@ -258,16 +367,104 @@ async def set_default_message(message: Message, session: AsyncSession, state: FS
     await state.clear()
 
 
-@router.message(SetDefaultMessage.setting_new_default_message)
+@router.message(SetDefaultMessage.setting_new_default_message, flags={"db": False})
 async def set_default_message_unknown(message: Message):
     await message.answer("Отправьте мне текстовое сообщение")
 
 
-@router.message()
+def parse_user_id(args: Optional[str]) -> Optional[int]:
+    user_id = (args or "").strip()
+    return int(user_id) if user_id.isdigit() else None
+
+
+@router.message(Command("block"), flags={"db": False})
+async def block_user(message: Message, command: CommandObject):
+    user_id = parse_user_id(command.args)
+    if user_id is None:
+        await message.answer("Укажите Telegram ID пользователя: /block 123456789")
+        return
+
+    if not blocklist.add(user_id, MANUAL_REASON):
+        await message.answer(f"Пользователь {user_id} уже в глобальном блоклисте")
+        return
+
+    await blocklist.flush()
+    await message.answer(f"Пользователь {user_id} добавлен в глобальный блоклист")
+
+
+@router.message(Command("unblock"), flags={"db": False})
+async def unblock_user(message: Message, command: CommandObject):
+    user_id = parse_user_id(command.args)
+    if user_id is None:
+        await message.answer("Укажите Telegram ID пользователя: /unblock 123456789")
+        return
+
+    if await blocklist.remove(user_id):
+        await message.answer(f"Пользователь {user_id} удален из глобального блоклиста")
+
+    else:
+        await message.answer(f"Пользователя {user_id} нет в глобальном блоклисте")
+
+
+class ImportChats(StatesGroup):
+    waiting_file = State()
+
+
+@router.message(Command("export_chats"))
+async def export_chats(message: Message, command: CommandObject, session: AsyncSession):
+    file_format = (command.args or "csv").strip().lower()
+    if file_format not in FILE_FORMATS:
+        await message.answer(f"Формат экспорта: {' или '.join(FILE_FORMATS)}")
+        return
+
+    chats = await get_all_chats(session)
+    await message.answer_document(
+        BufferedInputFile(dump_chats(chats, file_format), filename=f"chats.{file_format}"),
+        caption=f"Всего чатов: {len(chats)}"
+    )
+
+
+@router.message(Command("import_chats"), flags={"db": False})
+async def import_chats_request(message: Message, state: FSMContext):
+    await message.answer(
+        "Отправьте CSV или JSON файл с колонками telegram_id, title, username, allowed_members, "
+        "arab_filter_flag, filter_profile, use_blocklist",
+        reply_markup=get_cancel_menu()
+    )
+    await state.set_state(ImportChats.waiting_file)
+
+
+@router.message(ImportChats.waiting_file, F.text.lower().contains("отменить"), flags={"db": False})
+async def import_chats_cancel(message: Message, state: FSMContext):
+    await message.answer(text="Действие отменено", reply_markup=get_start_menu())
+    await state.clear()
+
+
+@router.message(ImportChats.waiting_file, F.document)
+async def import_chats_file(message: Message, session: AsyncSession, state: FSMContext):
+    try:
+        file_format = get_file_format(message.document.file_name or "")
+        data = await message.bot.download(message.document)
+        report = await import_chats(session, data.read(), file_format)
+
+    except ValueError as e:
+        await message.answer(f"Не удалось импортировать чаты: {e}")
+        return
+
+    await message.answer(report.to_text(), reply_markup=get_start_menu())
+    await state.clear()
+
+
+@router.message(ImportChats.waiting_file, flags={"db": False})
+async def import_chats_unknown(message: Message):
+    await message.answer("Отправьте мне CSV или JSON файл")
+
+
+@router.message(flags={"db": False})
 async def unknown_message(message: Message):
     await message.answer("Неизвестная команда", reply_markup=get_start_menu())
 
 
-@router.callback_query()
+@router.callback_query(flags={"db": False})
 async def unknown_callback(callback: CallbackQuery):
     await callback.answer()
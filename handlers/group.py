@@ -1,78 +1,103 @@
-import re
-from enum import Enum
+from typing import Optional
 
 from aiogram import Router, Bot
+from aiogram.exceptions import TelegramAPIError
 from aiogram.filters import ChatMemberUpdatedFilter, IS_NOT_MEMBER, IS_MEMBER, LEFT
-from aiogram.types import ChatMemberUpdated
-from sqlalchemy.ext.asyncio import AsyncSession
-
-from database.orm_queries import find_chat_by_telegram_id, add_member, set_member_status, \
-    find_member_by_telegram_id_and_chat_id, count_members
+from aiogram.types import ChatMemberUpdated, User
+from database.core_queries import find_cached_chat_record
+from database.engine import engine
+from database.models import MemberStatus
+from database.orm_queries import get_member_values
 from filters.chat_type import ChatTypeFilter
+from services.ban_executor import ban_executor
+from services.blocklist import blocklist
+from services.member_writer import member_writer
+from services.metrics import JOINS, BANS
+from services.name_filter import get_name_filter, NameFilter
+from services.raid_detector import raid_detector
+from services.state import join_counters
 
 
 router = Router()
 router.message.filter(ChatTypeFilter(is_group=True))
 
 
-class MemberStatus(Enum):
-    JOIN = "join"
-    LEAVE = "leave"
-    BAN_BY_JOIN = "ban_by_join"
-    BAN_BY_FILTER = "ban_by_filter"
+async def get_user_bio(bot: Bot, user_id: int) -> Optional[str]:
+    try:
+        user_chat = await bot.get_chat(user_id)
+
+    except TelegramAPIError:
+        return None
+
+    return user_chat.bio
 
 
-def contains_arabic_or_chinese_symbol(text):
-    arabic_range = re.compile(r'[\u0600-\u06FF]')
-    chinese_range = re.compile(r'[\u4E00-\u9FFF]')
+async def is_filtered(bot: Optional[Bot], user: User, name_filter: NameFilter) -> bool:
+    if name_filter.check(user.full_name, user.username):
+        return True
 
-    contains_arabic = arabic_range.search(text) is not None
-    contains_chinese = chinese_range.search(text) is not None
+    if bot is None or not name_filter.rules.check_bio:
+        return False
 
-    return contains_arabic or contains_chinese
+    return name_filter.check_bio(await get_user_bio(bot, user.id)) is not None
 
 
-async def process_member_status(event: ChatMemberUpdated, session: AsyncSession, status: MemberStatus, bot: Bot = None):
-    found_chat = await find_chat_by_telegram_id(session, str(event.chat.id))
+async def process_member_status(event: ChatMemberUpdated, status: MemberStatus, bot: Bot = None):
+    found_chat = await find_cached_chat_record(engine, str(event.chat.id))
 
     if not found_chat:
         return
 
     member = event.new_chat_member.user
-    found_member = await find_member_by_telegram_id_and_chat_id(session, str(member.id), found_chat.id)
-
-    if found_member:
-        found_member = await set_member_status(session, found_member, status.value)
-
-    else:
-        found_member = await add_member(
-            session,
-            str(member.id),
-            found_chat.id,
-            member.username,
-            member.first_name,
-            member.last_name,
-            True if member.is_premium else False,
-            status=status.value
-        )
 
     if status == MemberStatus.JOIN:
-        joined_members = await count_members(session, found_chat.id, ["join", "ban_by_join", "ban_by_filter"])
+        JOINS.inc()
+
+        if found_chat.use_blocklist and member.id in blocklist:
+            BANS.inc("blocklist")
+            await ban_executor.submit(event.chat.id, member.id)
+            return
+
+        joined_members = await join_counters.add_join(found_chat.id)
+        is_raid = raid_detector.add_join(found_chat.id)
+
+        if is_raid:
+            status = MemberStatus.BAN_BY_RAID
+
+        elif joined_members >= found_chat.allowed_members:
+            status = MemberStatus.BAN_BY_JOIN
+
+        elif found_chat.arab_filter_flag and await is_filtered(bot, member, get_name_filter(found_chat.filter_profile)):
+            status = MemberStatus.BAN_BY_FILTER
+
+        if status != MemberStatus.JOIN:
+            await join_counters.add_ban(found_chat.id, status)
+
+    if status in (MemberStatus.BAN_BY_JOIN, MemberStatus.BAN_BY_RAID, MemberStatus.BAN_BY_FILTER):
+        BANS.inc(status.value)
+
+        # limit and raid bans depend on the chat at join time, only filter bans say something about the user
+        if status == MemberStatus.BAN_BY_FILTER and found_chat.use_blocklist:
+            blocklist.add(member.id, status.value, found_chat.id)
 
-        if joined_members >= found_chat.allowed_members:
-            await bot.ban_chat_member(event.chat.id, member.id)
-            await set_member_status(session, found_member, MemberStatus.BAN_BY_JOIN.value)
+        await ban_executor.submit(event.chat.id, member.id)
 
-        elif found_chat.arab_filter_flag and contains_arabic_or_chinese_symbol(member.full_name):
-            await bot.ban_chat_member(event.chat.id, member.id)
-            await set_member_status(session, found_member, MemberStatus.BAN_BY_FILTER.value)
+    member_writer.submit(get_member_values(
+        str(member.id),
+        found_chat.id,
+        member.username,
+        member.first_name,
+        member.last_name,
+        True if member.is_premium else False,
+        status=status.value
+    ))
 
 
-@router.chat_member(ChatMemberUpdatedFilter(IS_NOT_MEMBER >> IS_MEMBER))
-async def on_user_join(event: ChatMemberUpdated, session: AsyncSession, bot: Bot):
-    await process_member_status(event, session, MemberStatus.JOIN, bot)
+@router.chat_member(ChatMemberUpdatedFilter(IS_NOT_MEMBER >> IS_MEMBER), flags={"db": False})
+async def on_user_join(event: ChatMemberUpdated, bot: Bot):
+    await process_member_status(event, MemberStatus.JOIN, bot)
 
 
-@router.chat_member(ChatMemberUpdatedFilter(IS_MEMBER >> LEFT))
-async def on_user_leave(event: ChatMemberUpdated, session: AsyncSession):
-    await process_member_status(event, session, MemberStatus.LEAVE)
+@router.chat_member(ChatMemberUpdatedFilter(IS_MEMBER >> LEFT), flags={"db": False})
+async def on_user_leave(event: ChatMemberUpdated):
+    await process_member_status(event, MemberStatus.LEAVE)
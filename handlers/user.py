@@ -2,8 +2,9 @@ from aiogram import Router
 from aiogram.types import Message
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from database.orm_queries import get_default_message_latest
+from database.orm_queries import get_default_message_text
 from filters.chat_type import ChatTypeFilter
+from services.reply_throttle import reply_throttle
 
 
 router = Router()
@@ -12,7 +13,7 @@ router.message.filter(ChatTypeFilter(is_group=False))
 
 @router.message()
 async def default_answer(message: Message, session: AsyncSession):
-    latest_default_message = await get_default_message_latest(session)
+    latest_default_message_text = await get_default_message_text(session)
 
-    if latest_default_message:
-        await message.answer(latest_default_message.text)
+    if latest_default_message_text and reply_throttle.allow(message.from_user.id):
+        await message.answer(latest_default_message_text)
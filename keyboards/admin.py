@@ -1,18 +1,25 @@
 import math
+from datetime import datetime
 from enum import Enum
-from typing import Optional, Union, Sequence
+from typing import Optional, Union, Sequence, Tuple
 
 from aiogram.types import ReplyKeyboardMarkup, KeyboardButtonRequestChat, InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.utils.keyboard import ReplyKeyboardBuilder, InlineKeyboardBuilder
 from aiogram.filters.callback_data import CallbackData
+from sqlalchemy import Row
 
 from config_reader import config
-from database.models import Chat
+from services.name_filter import DEFAULT_FILTER_PROFILE, get_name_filter
 
 
 class SettingType(str, Enum):
     members_count = "members_count"
     arab_filter_flag = "arab_filter_flag"
+    filter_profile = "filter_profile"
+    use_blocklist = "use_blocklist"
+    export_request = "export_request"
+    export_submit = "export_submit"
+    export_cancel = "export_cancel"
     delete_request = "delete_request"
     delete_submit = "delete_submit"
     delete_cancel = "delete_cancel"
@@ -43,7 +50,12 @@ def get_start_menu() -> ReplyKeyboardMarkup:
     return kb.as_markup(resize_keyboard=True)
 
 
-def get_chat_settings_menu(chat_id: int, current_arab_filter_flag: bool = True) -> InlineKeyboardMarkup:
+def get_chat_settings_menu(
+        chat_id: int,
+        current_arab_filter_flag: bool = True,
+        current_filter_profile: str = DEFAULT_FILTER_PROFILE,
+        current_use_blocklist: bool = True
+) -> InlineKeyboardMarkup:
     kb = InlineKeyboardBuilder()
 
     kb.button(text="-10 👤", callback_data=ChatSettingsCbData(
@@ -77,12 +89,33 @@ def get_chat_settings_menu(chat_id: int, current_arab_filter_flag: bool = True)
             )
         )
 
+    kb.button(
+        text=f"🧹 Профиль фильтра: {get_name_filter(current_filter_profile).rules.title}",
+        callback_data=ChatSettingsCbData(
+            chat_id=chat_id,
+            setting_type=SettingType.filter_profile
+        )
+    )
+
+    kb.button(
+        text=f"🌐 {'Выключить' if current_use_blocklist else 'Включить'} глобальный блоклист",
+        callback_data=ChatSettingsCbData(
+            chat_id=chat_id,
+            setting_type=SettingType.use_blocklist
+        )
+    )
+
+    kb.button(text="📄 Выгрузить события", callback_data=ChatSettingsCbData(
+        chat_id=chat_id,
+        setting_type=SettingType.export_request
+    ))
+
     kb.button(text="🗑 Удалить", callback_data=ChatSettingsCbData(
         chat_id=chat_id,
         setting_type=SettingType.delete_request
     ))
 
-    kb.adjust(2, 1, 1)
+    kb.adjust(2, 1, 1, 1, 1, 1)
 
     return kb.as_markup()
 
@@ -103,6 +136,29 @@ def get_delete_request_menu(chat_id: int) -> InlineKeyboardMarkup:
     return kb.as_markup()
 
 
+EXPORT_PERIODS = (1, 7, 30)
+
+
+def get_export_request_menu(chat_id: int) -> InlineKeyboardMarkup:
+    kb = InlineKeyboardBuilder()
+
+    for days in EXPORT_PERIODS:
+        kb.button(text=f"За {days} дн.", callback_data=ChatSettingsCbData(
+            chat_id=chat_id,
+            setting_type=SettingType.export_submit,
+            value=days
+        ))
+
+    kb.button(text="Назад", callback_data=ChatSettingsCbData(
+        chat_id=chat_id,
+        setting_type=SettingType.export_cancel
+    ))
+
+    kb.adjust(len(EXPORT_PERIODS), 1)
+
+    return kb.as_markup()
+
+
 def get_cancel_menu() -> ReplyKeyboardMarkup:
     kb = ReplyKeyboardBuilder()
     kb.button(text="⬅️ Отменить")
@@ -114,33 +170,61 @@ class ChatInfoCbData(CallbackData, prefix="chat_info"):
     chat_id: int
 
 
+CURSOR_FORMAT = "%Y%m%d%H%M%S%f"
+
+
 class PaginationCbData(CallbackData, prefix="pagination"):
     page: int
+    cursor_created_at: Optional[str] = None
+    cursor_id: Optional[int] = None
+    backward: bool = False
+
+    @classmethod
+    def from_chat(cls, page: int, chat: Row, backward: bool = False) -> "PaginationCbData":
+        return cls(
+            page=page,
+            cursor_created_at=chat.created_at.strftime(CURSOR_FORMAT),
+            cursor_id=chat.id,
+            backward=backward
+        )
 
+    def get_cursor(self) -> Optional[Tuple[datetime, int]]:
+        if self.cursor_created_at is None or self.cursor_id is None:
+            return None
 
-async def get_all_chats_menu(chats: Sequence[Chat], page: int = 0) -> InlineKeyboardMarkup:
+        return datetime.strptime(self.cursor_created_at, CURSOR_FORMAT), self.cursor_id
+
+
+async def get_all_chats_menu(chats: Sequence[Row], total: int, page: int = 0) -> InlineKeyboardMarkup:
     limit = config.page_limit
     start_offset = page * limit
-    end_offset = start_offset + limit
-    index = 1
 
     kb = InlineKeyboardBuilder()
 
-    for chat in chats[start_offset:end_offset]:
+    for index, chat in enumerate(chats, start=1):
         kb.row(InlineKeyboardButton(
             text=f"{start_offset + index}. {chat.title}",
             callback_data=ChatInfoCbData(chat_id=chat.id).pack()
         ))
-        index += 1
 
-    pages_count = math.ceil(len(chats) / limit)
-    previous_page = (page - 1) if page > 0 else pages_count - 1
-    next_page = (page + 1) if end_offset < len(chats) else 0
+    pages_count = math.ceil(total / limit)
+
+    if page > 0:
+        previous_page = PaginationCbData.from_chat(page - 1, chats[0], backward=True)
+
+    else:
+        previous_page = PaginationCbData(page=pages_count - 1, backward=True)
+
+    if page < pages_count - 1:
+        next_page = PaginationCbData.from_chat(page + 1, chats[-1])
+
+    else:
+        next_page = PaginationCbData(page=0)
 
     pagination_buttons = [
-        InlineKeyboardButton(text="⬅️", callback_data=PaginationCbData(page=previous_page).pack()),
+        InlineKeyboardButton(text="⬅️", callback_data=previous_page.pack()),
         InlineKeyboardButton(text=f"{page+1}/{pages_count}", callback_data="none"),
-        InlineKeyboardButton(text="➡️", callback_data=PaginationCbData(page=next_page).pack())
+        InlineKeyboardButton(text="➡️", callback_data=next_page.pack())
     ]
 
     kb.row(*pagination_buttons)
@@ -1,9 +1,35 @@
-from typing import Any, Awaitable, Callable, Dict
+from typing import Any, Awaitable, Callable, Dict, Optional
 
 from aiogram import BaseMiddleware
+from aiogram.dispatcher.flags import get_flag
 from aiogram.types import TelegramObject
 
-from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
+
+from services.metrics import DB_SESSIONS
+
+
+class LazySession:
+    def __init__(self, session_pool: async_sessionmaker):
+        self._session_pool = session_pool
+        self._session: Optional[AsyncSession] = None
+
+    @property
+    def is_opened(self) -> bool:
+        return self._session is not None
+
+    def _get_session(self) -> AsyncSession:
+        if self._session is None:
+            self._session = self._session_pool()
+
+        return self._session
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._get_session(), name)
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
 
 
 class DatabaseSessionMiddleware(BaseMiddleware):
@@ -16,6 +42,19 @@ class DatabaseSessionMiddleware(BaseMiddleware):
         event: TelegramObject,
         data: Dict[str, Any],
     ) -> Any:
-        async with self.session_pool() as session:
-            data["session"] = session
+        handler_object = data.get("handler")
+        handler_name = handler_object.callback.__name__ if handler_object else "unknown"
+
+        if get_flag(data, "db", default=True) is False:
+            DB_SESSIONS.inc(handler_name, "skipped")
             return await handler(event, data)
+
+        session = LazySession(self.session_pool)
+        data["session"] = session
+
+        try:
+            return await handler(event, data)
+
+        finally:
+            await session.close()
+            DB_SESSIONS.inc(handler_name, "opened" if session.is_opened else "unused")
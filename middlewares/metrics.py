@@ -0,0 +1,58 @@
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware, Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramAPIError
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+from aiogram.types import TelegramObject
+
+from services.metrics import HANDLER_LATENCY, TELEGRAM_API_ERRORS, TELEGRAM_API_LATENCY
+
+
+class HandlerMetricsMiddleware(BaseMiddleware):
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        handler_object = data.get("handler")
+        handler_name = handler_object.callback.__name__ if handler_object else "unknown"
+
+        status = "ok"
+        started_at = time.perf_counter()
+
+        try:
+            return await handler(event, data)
+
+        except Exception:
+            status = "error"
+            raise
+
+        finally:
+            HANDLER_LATENCY.observe(time.perf_counter() - started_at, handler_name, status)
+
+
+class TelegramApiMetricsMiddleware(BaseRequestMiddleware):
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        method_name = type(method).__name__
+        status = "ok"
+        started_at = time.perf_counter()
+
+        try:
+            return await make_request(bot, method)
+
+        except TelegramAPIError as e:
+            status = "error"
+            TELEGRAM_API_ERRORS.inc(method_name, type(e).__name__)
+            raise
+
+        finally:
+            TELEGRAM_API_LATENCY.observe(time.perf_counter() - started_at, method_name, status)
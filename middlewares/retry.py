@@ -0,0 +1,76 @@
+import asyncio
+import logging
+import random
+from typing import Collection
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramNetworkError, TelegramServerError
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+
+from services.metrics import TELEGRAM_API_RETRIES
+
+
+logger = logging.getLogger(__name__)
+
+# a timed out request may already have been applied by Telegram, so only methods that are safe to repeat are retried
+IDEMPOTENT_METHODS = frozenset({
+    "answerCallbackQuery",
+    "banChatMember",
+    "deleteWebhook",
+    "editMessageCaption",
+    "editMessageReplyMarkup",
+    "editMessageText",
+    "getChat",
+    "getChatMember",
+    "getFile",
+    "getMe",
+    "getUpdates",
+    "setWebhook",
+})
+
+
+class RetryRequestMiddleware(BaseRequestMiddleware):
+    def __init__(
+        self,
+        attempts: int,
+        backoff: float,
+        max_backoff: float,
+        methods: Collection[str] = IDEMPOTENT_METHODS
+    ) -> None:
+        self.attempts = attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.methods = methods
+
+    def get_delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        if method.__api_method__ not in self.methods:
+            return await make_request(bot, method)
+
+        attempt = 0
+
+        while True:
+            try:
+                return await make_request(bot, method)
+
+            except (TelegramNetworkError, TelegramServerError) as e:
+                attempt += 1
+                if attempt >= self.attempts:
+                    raise
+
+                delay = self.get_delay(attempt - 1)
+                TELEGRAM_API_RETRIES.inc(type(method).__name__, type(e).__name__)
+                logger.warning(
+                    "Retrying %s in %.2f s after %s (attempt %s/%s)",
+                    type(method).__name__, delay, type(e).__name__, attempt + 1, self.attempts
+                )
+                await asyncio.sleep(delay)
@@ -0,0 +1,23 @@
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from services.chat_shards import ChatShardExecutor
+
+
+class ChatShardMiddleware(BaseMiddleware):
+    def __init__(self, executor: ChatShardExecutor):
+        self.executor = executor
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        chat = getattr(event, "chat", None)
+        if chat is None:
+            return await handler(event, data)
+
+        return await self.executor.run(chat.id, lambda: handler(event, data))
@@ -0,0 +1,125 @@
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramAPIError, TelegramRetryAfter
+
+from config_reader import config
+from services.state import state_backend
+
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+
+    def reserve(self) -> float:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+        self._tokens -= 1
+
+        return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+class BanExecutor:
+    def __init__(self, rate_limit: float, chat_rate_limit: float, workers: int, max_attempts: int = 5) -> None:
+        self.chat_rate_limit = chat_rate_limit
+        self.workers = workers
+        self.max_attempts = max_attempts
+
+        self._queue: asyncio.Queue[Tuple[int, int]] = asyncio.Queue()
+        self._pending: Set[Tuple[int, int]] = set()
+        self._global_bucket = TokenBucket(rate_limit)
+        self._chat_buckets: Dict[int, TokenBucket] = {}
+        self._resume_at = 0.0
+        self._tasks: List[asyncio.Task] = []
+        self._bot: Optional[Bot] = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def start(self, bot: Bot) -> None:
+        self._bot = bot
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+
+        except asyncio.TimeoutError:
+            logger.warning("Ban queue was not drained on shutdown, %s bans dropped", self.pending)
+
+        for task in self._tasks:
+            task.cancel()
+
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, chat_id: int, user_id: int) -> bool:
+        key = (chat_id, user_id)
+        if key in self._pending:
+            return False
+
+        if not await state_backend.claim_ban(chat_id, user_id):
+            return False
+
+        self._pending.add(key)
+        self._queue.put_nowait(key)
+        return True
+
+    async def _wait_turn(self, chat_id: int) -> None:
+        chat_bucket = self._chat_buckets.get(chat_id)
+        if chat_bucket is None:
+            chat_bucket = self._chat_buckets[chat_id] = TokenBucket(self.chat_rate_limit)
+
+        delay = max(self._global_bucket.reserve(), chat_bucket.reserve(), self._resume_at - time.monotonic())
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _ban(self, chat_id: int, user_id: int) -> None:
+        for attempt in range(1, self.max_attempts + 1):
+            await self._wait_turn(chat_id)
+
+            try:
+                await self._bot.ban_chat_member(chat_id, user_id)
+                return
+
+            except TelegramRetryAfter as e:
+                logger.warning("Flood control on ban in chat %s, retry after %s s", chat_id, e.retry_after)
+                self._resume_at = max(self._resume_at, time.monotonic() + e.retry_after)
+
+            except TelegramAPIError as e:
+                logger.error("Failed to ban user %s in chat %s: %s", user_id, chat_id, e)
+                return
+
+        logger.error("Gave up banning user %s in chat %s after %s attempts", user_id, chat_id, self.max_attempts)
+
+    async def _work(self) -> None:
+        while True:
+            chat_id, user_id = await self._queue.get()
+
+            try:
+                await self._ban(chat_id, user_id)
+
+            except Exception:
+                logger.exception("Unexpected error while banning user %s in chat %s", user_id, chat_id)
+
+            finally:
+                self._pending.discard((chat_id, user_id))
+                self._queue.task_done()
+
+
+ban_executor = BanExecutor(
+    rate_limit=config.ban_rate_limit,
+    chat_rate_limit=config.ban_chat_rate_limit,
+    workers=config.ban_workers
+)
@@ -0,0 +1,113 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional, Set
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from config_reader import config
+from database.core_queries import add_blocked_users, delete_blocked_user, get_blocked_user_ids
+from database.engine import engine
+from services.metrics import BLOCKLIST_SIZE
+
+
+logger = logging.getLogger(__name__)
+
+MANUAL_REASON = "manual"
+
+
+class Blocklist:
+    def __init__(self, bind: AsyncEngine, interval: float, reload_interval: float) -> None:
+        self.bind = bind
+        self.interval = interval
+        self.reload_interval = reload_interval
+        self._user_ids: Set[int] = set()
+        self._pending: Dict[int, Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self._user_ids
+
+    def __len__(self) -> int:
+        return len(self._user_ids)
+
+    async def load(self) -> int:
+        async with self._lock:
+            async with self.bind.connect() as connection:
+                user_ids = set(await get_blocked_user_ids(connection))
+
+            # entries added by other bot instances show up here, entries removed by them disappear
+            self._user_ids = user_ids | self._pending.keys()
+            return len(self._user_ids)
+
+    def add(self, user_id: int, reason: str, chat_id: Optional[int] = None) -> bool:
+        if user_id in self._user_ids:
+            return False
+
+        self._user_ids.add(user_id)
+        self._pending[user_id] = {"telegram_id": user_id, "reason": reason, "chat_id": chat_id}
+        return True
+
+    async def remove(self, user_id: int) -> bool:
+        async with self._lock:
+            self._user_ids.discard(user_id)
+            removed = self._pending.pop(user_id, None) is not None
+
+            async with self.bind.begin() as connection:
+                return await delete_blocked_user(connection, user_id) or removed
+
+    async def flush(self) -> int:
+        async with self._lock:
+            if not self._pending:
+                return 0
+
+            pending, self._pending = self._pending, {}
+
+            try:
+                async with self.bind.begin() as connection:
+                    await add_blocked_users(connection, list(pending.values()))
+
+            except Exception:
+                logger.exception("Failed to persist %s blocklist entries, will retry", len(pending))
+                pending.update(self._pending)
+                self._pending = pending
+                return 0
+
+            return len(pending)
+
+    async def _run(self) -> None:
+        reload_at = time.monotonic() + self.reload_interval
+
+        while True:
+            await asyncio.sleep(self.interval)
+
+            try:
+                await self.flush()
+
+                if time.monotonic() >= reload_at:
+                    await self.load()
+                    reload_at = time.monotonic() + self.reload_interval
+
+            except Exception:
+                logger.exception("Failed to sync the blocklist with the database")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+        await self.flush()
+
+
+blocklist = Blocklist(
+    bind=engine,
+    interval=config.blocklist_flush_interval,
+    reload_interval=config.blocklist_reload_interval
+)
+BLOCKLIST_SIZE.set_function(lambda: len(blocklist))
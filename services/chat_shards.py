@@ -0,0 +1,71 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, List, Tuple
+
+from config_reader import config
+from services.metrics import CHAT_SHARD_QUEUE
+
+
+logger = logging.getLogger(__name__)
+
+Job = Tuple[Callable[[], Awaitable[Any]], asyncio.Future]
+
+
+class ChatShardExecutor:
+    def __init__(self, shards: int) -> None:
+        self.shards = shards
+        self._queues: List[asyncio.Queue[Job]] = [asyncio.Queue() for _ in range(shards)]
+        self._tasks: List[asyncio.Task] = []
+
+        for index, queue in enumerate(self._queues):
+            CHAT_SHARD_QUEUE.set_function(queue.qsize, str(index))
+
+    @property
+    def pending(self) -> int:
+        return sum(queue.qsize() for queue in self._queues)
+
+    def get_shard(self, chat_id: int) -> int:
+        return chat_id % self.shards
+
+    def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._work(queue)) for queue in self._queues]
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        try:
+            await asyncio.wait_for(asyncio.gather(*(queue.join() for queue in self._queues)), timeout)
+
+        except asyncio.TimeoutError:
+            logger.warning("Chat shard queues were not drained on shutdown, %s updates dropped", self.pending)
+
+        for task in self._tasks:
+            task.cancel()
+
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def run(self, chat_id: int, function: Callable[[], Awaitable[Any]]) -> Any:
+        if not self._tasks:
+            return await function()
+
+        future = asyncio.get_running_loop().create_future()
+        self._queues[self.get_shard(chat_id)].put_nowait((function, future))
+        return await future
+
+    async def _work(self, queue: asyncio.Queue[Job]) -> None:
+        while True:
+            function, future = await queue.get()
+
+            try:
+                if not future.cancelled():
+                    future.set_result(await function())
+
+            except Exception as e:
+                if not future.cancelled():
+                    future.set_exception(e)
+
+            finally:
+                queue.task_done()
+
+
+chat_shard_executor = ChatShardExecutor(config.chat_shards)
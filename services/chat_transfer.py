@@ -0,0 +1,227 @@
+import csv
+import io
+import json
+from contextlib import suppress
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Sequence, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models import Chat
+from database.orm_queries import find_chats_by_telegram_ids, upsert_chats
+from services.name_filter import DEFAULT_FILTER_PROFILE, FILTER_PROFILES
+
+
+CHAT_FIELDS = (
+    "telegram_id", "title", "username", "allowed_members", "arab_filter_flag", "filter_profile", "use_blocklist"
+)
+SETTING_FIELDS = ("allowed_members", "arab_filter_flag", "filter_profile", "use_blocklist")
+FILE_FORMATS = ("csv", "json")
+
+DEFAULT_ALLOWED_MEMBERS = 200
+MAX_ALLOWED_MEMBERS = 1000
+TRUE_VALUES = {"1", "true", "yes", "on", "да"}
+FALSE_VALUES = {"0", "false", "no", "off", "нет"}
+
+REPORT_LIMIT = 20
+
+
+def get_file_format(filename: str) -> str:
+    file_format = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    if file_format not in FILE_FORMATS:
+        raise ValueError(f"Неподдерживаемый формат файла, ожидается {' или '.join(FILE_FORMATS)}")
+
+    return file_format
+
+
+def _parse_bool(value: Any, name: str) -> bool:
+    if isinstance(value, bool):
+        return value
+
+    if value is None or str(value).strip() == "":
+        return True
+
+    text = str(value).strip().lower()
+    if text in TRUE_VALUES:
+        return True
+
+    if text in FALSE_VALUES:
+        return False
+
+    raise ValueError(f"некорректное значение {name}: {value!r}")
+
+
+def _parse_allowed_members(value: Any) -> int:
+    if value is None or isinstance(value, str) and not value.strip():
+        return DEFAULT_ALLOWED_MEMBERS
+
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+
+    if isinstance(value, str):
+        with suppress(ValueError):
+            return int(value.strip())
+
+    raise ValueError(f"некорректный лимит пользователей: {value!r}")
+
+
+def validate_chat(record: Dict[str, Any]) -> Dict[str, Any]:
+    telegram_id = str(record.get("telegram_id") or "").strip()
+    if not telegram_id.lstrip("-").isdigit():
+        raise ValueError(f"некорректный telegram_id: {record.get('telegram_id')!r}")
+
+    title = str(record.get("title") or "").strip()
+    if not title or len(title) > 255:
+        raise ValueError("название должно быть от 1 до 255 символов")
+
+    username = str(record.get("username") or "").strip().lstrip("@") or None
+    if username and len(username) > 255:
+        raise ValueError("username длиннее 255 символов")
+
+    allowed_members = _parse_allowed_members(record.get("allowed_members"))
+    if not 0 <= allowed_members <= MAX_ALLOWED_MEMBERS:
+        raise ValueError(f"лимит пользователей должен быть от 0 до {MAX_ALLOWED_MEMBERS}")
+
+    filter_profile = str(record.get("filter_profile") or "").strip() or DEFAULT_FILTER_PROFILE
+    if filter_profile not in FILTER_PROFILES:
+        raise ValueError(f"неизвестный профиль фильтра: {filter_profile!r}")
+
+    return {
+        "telegram_id": str(int(telegram_id)),
+        "title": title,
+        "username": username,
+        "allowed_members": allowed_members,
+        "arab_filter_flag": _parse_bool(record.get("arab_filter_flag"), "arab_filter_flag"),
+        "filter_profile": filter_profile,
+        "use_blocklist": _parse_bool(record.get("use_blocklist"), "use_blocklist")
+    }
+
+
+def read_records(data: bytes, file_format: str) -> List[Dict[str, Any]]:
+    text = data.decode("utf-8-sig")
+
+    if file_format == "json":
+        records = json.loads(text)
+        if not isinstance(records, list) or not all(isinstance(record, dict) for record in records):
+            raise ValueError("JSON должен содержать список объектов")
+
+        return records
+
+    try:
+        return list(csv.DictReader(io.StringIO(text)))
+
+    except csv.Error as e:
+        raise ValueError(f"некорректный CSV: {e}")
+
+
+def parse_chats(data: bytes, file_format: str) -> Tuple[List[Dict[str, Any]], List[str]]:
+    chats: List[Dict[str, Any]] = []
+    errors: List[str] = []
+    positions: Dict[str, int] = {}
+
+    # CSV rows are numbered after the header line
+    first_position = 2 if file_format == "csv" else 1
+
+    for position, record in enumerate(read_records(data, file_format), start=first_position):
+        try:
+            chat = validate_chat(record)
+
+        except ValueError as e:
+            errors.append(f"#{position}: {e}")
+            continue
+
+        if chat["telegram_id"] in positions:
+            errors.append(f"#{position}: чат {chat['telegram_id']} уже указан в #{positions[chat['telegram_id']]}")
+            continue
+
+        positions[chat["telegram_id"]] = position
+        chats.append(chat)
+
+    return chats, errors
+
+
+def get_chat_values(chat: Chat) -> Dict[str, Any]:
+    return {
+        "telegram_id": chat.telegram_id,
+        "title": chat.title,
+        "username": chat.username,
+        "allowed_members": chat.allowed_members,
+        "arab_filter_flag": bool(chat.arab_filter_flag),
+        "filter_profile": chat.filter_profile,
+        "use_blocklist": bool(chat.use_blocklist)
+    }
+
+
+def dump_chats(chats: Sequence[Chat], file_format: str) -> bytes:
+    values = [get_chat_values(chat) for chat in chats]
+
+    if file_format == "json":
+        return json.dumps(values, ensure_ascii=False, indent=2).encode("utf-8")
+
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CHAT_FIELDS)
+    writer.writeheader()
+    writer.writerows(values)
+    return buffer.getvalue().encode("utf-8")
+
+
+@dataclass
+class ImportReport:
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    errors: List[str] = field(default_factory=list)
+    conflicts: List[str] = field(default_factory=list)
+
+    def to_text(self) -> str:
+        lines = [f"Добавлено: {self.created}, обновлено: {self.updated}, без изменений: {self.unchanged}"]
+
+        for title, items in (("Ошибки", self.errors), ("Перезаписаны настройки", self.conflicts)):
+            if not items:
+                continue
+
+            lines.append(f"\n{title} ({len(items)}):")
+            lines.extend(items[:REPORT_LIMIT])
+
+            if len(items) > REPORT_LIMIT:
+                lines.append(f"… и ещё {len(items) - REPORT_LIMIT}")
+
+        return "\n".join(lines)
+
+
+async def import_chats(session: AsyncSession, data: bytes, file_format: str) -> ImportReport:
+    chats, errors = parse_chats(data, file_format)
+    report = ImportReport(errors=errors)
+
+    existing_chats = await find_chats_by_telegram_ids(session, [chat["telegram_id"] for chat in chats])
+    changed_chats = []
+
+    for chat in chats:
+        existing_chat = existing_chats.get(chat["telegram_id"])
+        if existing_chat is None:
+            report.created += 1
+            changed_chats.append(chat)
+            continue
+
+        existing_values = get_chat_values(existing_chat)
+        if existing_values == chat:
+            report.unchanged += 1
+            continue
+
+        report.updated += 1
+        changed_chats.append(chat)
+
+        changes = [
+            f"{name}: {existing_values[name]!r} → {chat[name]!r}"
+            for name in SETTING_FIELDS if existing_values[name] != chat[name]
+        ]
+        if changes:
+            report.conflicts.append(f"{chat['telegram_id']} ({existing_chat.title}): {', '.join(changes)}")
+
+    if changed_chats:
+        await upsert_chats(session, changed_chats)
+
+    return report
@@ -0,0 +1,35 @@
+import csv
+import os
+import tempfile
+from datetime import datetime
+from typing import Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config_reader import config
+from database.orm_queries import stream_member_events
+
+
+MEMBER_EVENT_FIELDS = (
+    "telegram_id", "username", "first_name", "last_name", "is_premium", "status", "created_at", "updated_at"
+)
+
+
+async def export_member_events(session: AsyncSession, chat_id: int, start: datetime, end: datetime) -> Tuple[str, int]:
+    file = tempfile.NamedTemporaryFile("w", suffix=".csv", encoding="utf-8", newline="", delete=False)
+    exported = 0
+
+    try:
+        with file:
+            writer = csv.writer(file)
+            writer.writerow(MEMBER_EVENT_FIELDS)
+
+            async for rows in stream_member_events(session, chat_id, start, end, config.member_export_batch_size):
+                writer.writerows(rows)
+                exported += len(rows)
+
+    except BaseException:
+        os.remove(file.name)
+        raise
+
+    return file.name, exported
@@ -0,0 +1,183 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.exc import DBAPIError, IntegrityError, InterfaceError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from config_reader import config
+from database.core_queries import write_member_statuses
+from database.engine import engine
+from services.metrics import MEMBER_WRITE_BATCHES, MEMBER_WRITE_DROPPED, MEMBER_WRITE_QUEUE
+
+
+logger = logging.getLogger(__name__)
+
+LOCK_ERROR_MARKERS = ("database is locked", "database table is locked", "deadlock detected", "could not serialize")
+
+
+def is_unavailable_error(error: Exception) -> bool:
+    if isinstance(error, (OSError, asyncio.TimeoutError, InterfaceError)):
+        return True
+
+    if not isinstance(error, DBAPIError):
+        return False
+
+    if error.connection_invalidated:
+        return True
+
+    message = str(error.orig).lower()
+    return isinstance(error, OperationalError) and any(marker in message for marker in LOCK_ERROR_MARKERS)
+
+
+class MemberWriter:
+    def __init__(
+        self,
+        bind: AsyncEngine,
+        batch_size: int,
+        interval: float,
+        max_size: int,
+        max_attempts: int = 5,
+        retry_backoff: float = 1.0,
+        max_retry_backoff: float = 30.0
+    ) -> None:
+        self.bind = bind
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.max_retry_backoff = max_retry_backoff
+
+        self._queue: asyncio.Queue[Dict[str, Any]] = asyncio.Queue(max_size)
+        self._task: Optional[asyncio.Task] = None
+        self._overflowing = False
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._work())
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        if self._task is None:
+            return
+
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+
+        except asyncio.TimeoutError:
+            logger.warning("Member write queue was not drained on shutdown, %s events dropped", self.pending)
+
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    def submit(self, member: Dict[str, Any]) -> bool:
+        # never block the chat_member path, bans must keep going while the database is unavailable
+        try:
+            self._queue.put_nowait(member)
+
+        except asyncio.QueueFull:
+            MEMBER_WRITE_DROPPED.inc("queue_full")
+            if not self._overflowing:
+                logger.warning("Member write queue is full, new member events are dropped")
+                self._overflowing = True
+
+            return False
+
+        self._overflowing = False
+        return True
+
+    async def _collect(self) -> List[Dict[str, Any]]:
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.interval
+
+        while len(batch) < self.batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    def _should_retry(self, error: Exception, attempt: int) -> bool:
+        # a locked or unreachable database recovers on its own, other operational errors get a few attempts
+        if is_unavailable_error(error):
+            return True
+
+        return isinstance(error, OperationalError) and attempt < self.max_attempts
+
+    async def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        attempt = 0
+        backoff = self.retry_backoff
+
+        while True:
+            try:
+                async with self.bind.begin() as connection:
+                    await write_member_statuses(connection, batch)
+
+            except IntegrityError:
+                MEMBER_WRITE_BATCHES.inc("error")
+
+                if len(batch) > 1:
+                    # keep the rest of the batch when a single event violates a constraint
+                    middle = len(batch) // 2
+                    await self._flush(batch[:middle])
+                    await self._flush(batch[middle:])
+                    return
+
+                MEMBER_WRITE_DROPPED.inc("error")
+                logger.exception("Failed to write member event %s, dropped", batch[0])
+                return
+
+            except Exception as e:
+                MEMBER_WRITE_BATCHES.inc("error")
+                attempt += 1
+
+                if not self._should_retry(e, attempt):
+                    MEMBER_WRITE_DROPPED.inc("error", amount=len(batch))
+                    logger.exception("Failed to write %s member events, batch dropped", len(batch))
+                    return
+
+                logger.warning("Failed to write %s member events, retry in %s s: %r", len(batch), backoff, e)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.max_retry_backoff)
+                continue
+
+            MEMBER_WRITE_BATCHES.inc("ok")
+            return
+
+    async def _work(self) -> None:
+        while True:
+            batch = await self._collect()
+
+            try:
+                await self._flush(batch)
+
+            except Exception:
+                logger.exception("Unexpected error while writing %s member events", len(batch))
+
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+
+member_writer = MemberWriter(
+    bind=engine,
+    batch_size=config.member_write_batch_size,
+    interval=config.member_write_interval,
+    max_size=config.member_write_queue_size
+)
+MEMBER_WRITE_QUEUE.set_function(lambda: member_writer.pending)
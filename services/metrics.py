@@ -0,0 +1,195 @@
+import bisect
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+from aiohttp import web
+
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+
+    if float(value).is_integer():
+        return str(int(value))
+
+    return repr(float(value))
+
+
+class Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _format_labels(self, labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(self.labelnames, labels)]
+        if extra:
+            pairs.append(f'{extra[0]}="{extra[1]}"')
+
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        header = f"# HELP {self.name} {self.documentation}\n# TYPE {self.name} {self.type}\n"
+        return header + "".join(f"{sample}\n" for sample in self.samples())
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def samples(self) -> Iterator[str]:
+        for labels, value in self._values.items():
+            yield f"{self.name}{self._format_labels(labels)} {_format_value(value)}"
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Labels, float] = {}
+        self._functions: Dict[Labels, Callable[[], float]] = {}
+
+    def set(self, value: float, *labels: str) -> None:
+        self._values[labels] = value
+
+    def set_function(self, function: Callable[[], float], *labels: str) -> None:
+        self._functions[labels] = function
+
+    def samples(self) -> Iterator[str]:
+        values = dict(self._values)
+        values.update({labels: function() for labels, function in self._functions.items()})
+
+        for labels, value in values.items():
+            yield f"{self.name}{self._format_labels(labels)} {_format_value(value)}"
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: Sequence[str] = (),
+            buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._counts: Dict[Labels, List[int]] = {}
+        self._sums: Dict[Labels, float] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        counts = self._counts.get(labels)
+        if counts is None:
+            counts = self._counts[labels] = [0] * len(self.buckets)
+            self._sums[labels] = 0.0
+
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        self._sums[labels] += value
+
+    def samples(self) -> Iterator[str]:
+        for labels, counts in self._counts.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                yield f"{self.name}_bucket{self._format_labels(labels, ('le', _format_value(bound)))} {cumulative}"
+
+            yield f"{self.name}_sum{self._format_labels(labels)} {_format_value(self._sums[labels])}"
+            yield f"{self.name}_count{self._format_labels(labels)} {cumulative}"
+
+
+MetricType = TypeVar("MetricType", bound=Metric)
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: MetricType) -> MetricType:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        return "".join(metric.render() for metric in self._metrics.values())
+
+
+registry = Registry()
+
+HANDLER_LATENCY = registry.register(Histogram(
+    "bot_handler_duration_seconds", "Time spent in update handlers", ("handler", "status")
+))
+QUERY_LATENCY = registry.register(Histogram(
+    "bot_db_query_duration_seconds", "Time spent executing SQL statements", ("statement",)
+))
+JOINS = registry.register(Counter("bot_joins_total", "Join events in whitelisted chats"))
+BANS = registry.register(Counter("bot_bans_total", "Ban decisions", ("reason",)))
+DB_SESSIONS = registry.register(Counter(
+    "bot_db_sessions_total", "Handled events by database session usage", ("handler", "state")
+))
+COMPACTED_MEMBERS = registry.register(Counter(
+    "bot_member_rows_compacted_total", "Member rows removed by the retention job"
+))
+MEMBER_WRITE_BATCHES = registry.register(Counter(
+    "bot_member_write_batches_total", "Batched member event writes", ("status",)
+))
+MEMBER_WRITE_DROPPED = registry.register(Counter(
+    "bot_member_write_dropped_total", "Member events dropped instead of written", ("reason",)
+))
+MEMBER_WRITE_QUEUE = registry.register(Gauge(
+    "bot_member_write_queue_size", "Member events waiting to be written"
+))
+CHAT_SHARD_QUEUE = registry.register(Gauge(
+    "bot_chat_shard_queue_size", "Chat member updates waiting in a chat shard queue", ("shard",)
+))
+BLOCKLIST_SIZE = registry.register(Gauge("bot_blocklist_size", "Users in the global blocklist"))
+RAIDS = registry.register(Counter("bot_raids_total", "Raid mode activations"))
+TELEGRAM_API_ERRORS = registry.register(Counter(
+    "bot_telegram_api_errors_total", "Failed Telegram Bot API requests", ("method", "error")
+))
+TELEGRAM_API_LATENCY = registry.register(Histogram(
+    "bot_telegram_api_duration_seconds", "Time spent in Telegram Bot API requests", ("method", "status")
+))
+TELEGRAM_API_RETRIES = registry.register(Counter(
+    "bot_telegram_api_retries_total", "Retried Telegram Bot API requests", ("method", "error")
+))
+
+
+async def metrics_handler(request: web.Request) -> web.Response:
+    return web.Response(text=registry.render(), content_type="text/plain", charset="utf-8")
+
+
+def setup_metrics_routes(app: web.Application, path: str = "/metrics") -> None:
+    app.router.add_get(path, metrics_handler)
+
+
+async def start_metrics_server(host: str, port: int) -> web.AppRunner:
+    app = web.Application()
+    setup_metrics_routes(app)
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
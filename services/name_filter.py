@@ -0,0 +1,165 @@
+import re
+import unicodedata
+from dataclasses import dataclass
+from enum import Enum
+from typing import Dict, Optional, Sequence, Tuple
+
+
+class FilterReason(str, Enum):
+    script = "script"
+    substring = "substring"
+    keyword = "keyword"
+    emoji_only = "emoji_only"
+
+
+SCRIPT_RANGES: Dict[str, Sequence[Tuple[int, int]]] = {
+    "arabic": (
+        (0x0600, 0x06FF),
+        (0x0750, 0x077F),
+        (0x0870, 0x08FF),
+        (0xFB50, 0xFDFF),
+        (0xFE70, 0xFEFF),
+        (0x10E60, 0x10E7F),
+        (0x1EE00, 0x1EEFF),
+    ),
+    "cjk": (
+        (0x3400, 0x4DBF),
+        (0x4E00, 0x9FFF),
+        (0xF900, 0xFAFF),
+        (0x20000, 0x2A6DF),
+        (0x2A700, 0x2EBEF),
+        (0x30000, 0x323AF),
+    ),
+    # radicals, CJK punctuation and symbols such as 〰 and 〽 that show up in ordinary names
+    "cjk_symbols": (
+        (0x2E80, 0x2FDF),
+        (0x3000, 0x303F),
+    ),
+    "kana": (
+        (0x3040, 0x30FF),
+        (0x31F0, 0x31FF),
+        (0xFF66, 0xFF9F),
+    ),
+    "hangul": (
+        (0x1100, 0x11FF),
+        (0x3130, 0x318F),
+        (0xAC00, 0xD7AF),
+    ),
+    "indic": (
+        (0x0900, 0x0DFF),
+    ),
+    "thai": (
+        (0x0E00, 0x0E7F),
+    ),
+    "ethiopic": (
+        (0x1200, 0x139F),
+    ),
+}
+
+HOMOGLYPHS = str.maketrans({
+    "а": "a", "в": "b", "е": "e", "ё": "e", "к": "k", "м": "m", "н": "h", "о": "o", "р": "p", "с": "c",
+    "т": "t", "у": "y", "х": "x", "і": "i", "ј": "j", "ѕ": "s", "ԁ": "d", "ԛ": "q", "ԝ": "w",
+    "α": "a", "β": "b", "ε": "e", "ι": "i", "κ": "k", "ν": "v", "ο": "o", "ρ": "p", "τ": "t", "υ": "u",
+    "χ": "x", "0": "o", "1": "i", "3": "e", "4": "a", "5": "s", "7": "t", "@": "a", "$": "s",
+})
+
+EMOJI_ONLY_PATTERN = re.compile(
+    r"[\s\u200d\u20e3\ufe0e\ufe0f\u2190-\u21ff\u2300-\u23ff\u2460-\u27bf\u2900-\u297f\u2b00-\u2bff"
+    r"\U0001f000-\U0001faff\U000e0020-\U000e007f]+"
+)
+
+
+def normalize(text: str) -> str:
+    return unicodedata.normalize("NFKC", text).casefold().translate(HOMOGLYPHS)
+
+
+def _char_class(ranges: Sequence[Tuple[int, int]]) -> str:
+    return "[" + "".join(f"{re.escape(chr(start))}-{re.escape(chr(end))}" for start, end in ranges) + "]"
+
+
+@dataclass(frozen=True)
+class NameFilterRules:
+    title: str
+    scripts: Tuple[str, ...] = ()
+    substrings: Tuple[str, ...] = ()
+    keywords: Tuple[str, ...] = ()
+    emoji_only: bool = False
+    check_username: bool = True
+    check_bio: bool = False
+
+
+class NameFilter:
+    def __init__(self, rules: NameFilterRules) -> None:
+        self.rules = rules
+
+        ranges = [script_range for script in rules.scripts for script_range in SCRIPT_RANGES[script]]
+        self._script_pattern = re.compile(_char_class(ranges)) if ranges else None
+
+        alternatives = []
+
+        if rules.substrings:
+            substrings = "|".join(re.escape(normalize(substring)) for substring in rules.substrings)
+            alternatives.append(f"(?P<{FilterReason.substring.value}>{substrings})")
+
+        if rules.keywords:
+            keywords = "|".join(re.escape(normalize(keyword)) for keyword in rules.keywords)
+            # "_" separates words in usernames, so only letters and digits extend a keyword
+            alternatives.append(rf"(?P<{FilterReason.keyword.value}>(?<![^\W_])(?:{keywords})(?![^\W_]))")
+
+        self._term_pattern = re.compile("|".join(alternatives)) if alternatives else None
+
+    def check(self, full_name: str, username: Optional[str] = None) -> Optional[FilterReason]:
+        if self.rules.emoji_only and EMOJI_ONLY_PATTERN.fullmatch(full_name):
+            return FilterReason.emoji_only
+
+        text = full_name
+        if self.rules.check_username and username:
+            text = f"{text}\n{username}"
+
+        return self._check_text(text)
+
+    def check_bio(self, bio: Optional[str]) -> Optional[FilterReason]:
+        if not self.rules.check_bio or not bio:
+            return None
+
+        return self._check_text(bio)
+
+    def _check_text(self, text: str) -> Optional[FilterReason]:
+        if self._script_pattern is not None and self._script_pattern.search(text):
+            return FilterReason.script
+
+        if self._term_pattern is not None:
+            match = self._term_pattern.search(normalize(text))
+            if match:
+                return FilterReason(match.lastgroup)
+
+        return None
+
+
+FILTER_PROFILES: Dict[str, NameFilter] = {
+    "default": NameFilter(NameFilterRules(
+        title="стандартный",
+        scripts=("arabic", "cjk"),
+        check_username=False
+    )),
+    "strict": NameFilter(NameFilterRules(
+        title="строгий",
+        scripts=("arabic", "cjk", "cjk_symbols", "kana", "hangul", "indic", "thai", "ethiopic"),
+        substrings=("t.me/", "http://", "https://", "bit.ly"),
+        keywords=("casino", "crypto", "bitcoin", "onlyfans", "porn", "sex", "xxx", "airdrop", "forex"),
+        emoji_only=True,
+        check_bio=True
+    )),
+}
+
+DEFAULT_FILTER_PROFILE = "default"
+
+
+def get_name_filter(profile: str) -> NameFilter:
+    return FILTER_PROFILES.get(profile) or FILTER_PROFILES[DEFAULT_FILTER_PROFILE]
+
+
+def get_next_filter_profile(profile: str) -> str:
+    profiles = list(FILTER_PROFILES)
+    index = profiles.index(profile) if profile in profiles else -1
+    return profiles[(index + 1) % len(profiles)]
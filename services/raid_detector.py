@@ -0,0 +1,90 @@
+import logging
+import time
+from typing import Dict, List, Optional
+
+from config_reader import config
+from services.metrics import RAIDS
+
+
+logger = logging.getLogger(__name__)
+
+
+class JoinRateWindow:
+    __slots__ = ("size", "_counts", "_second", "_total")
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self._counts: List[int] = [0] * size
+        self._second = 0
+        self._total = 0
+
+    def _advance(self, second: int) -> None:
+        if second - self._second >= self.size:
+            self._counts = [0] * self.size
+            self._total = 0
+
+        else:
+            for expired in range(self._second + 1, second + 1):
+                index = expired % self.size
+                self._total -= self._counts[index]
+                self._counts[index] = 0
+
+        self._second = second
+
+    def add(self, second: int) -> int:
+        if second > self._second:
+            self._advance(second)
+
+        self._counts[second % self.size] += 1
+        self._total += 1
+        return self._total
+
+
+class ChatRaidState:
+    __slots__ = ("window", "raid_until")
+
+    def __init__(self, window: int) -> None:
+        self.window = JoinRateWindow(window)
+        self.raid_until = 0.0
+
+
+class RaidDetector:
+    def __init__(self, threshold: int, window: int, duration: float) -> None:
+        self.threshold = threshold
+        self.window = window
+        self.duration = duration
+        self._chats: Dict[int, ChatRaidState] = {}
+
+    def add_join(self, chat_id: int, now: Optional[float] = None) -> bool:
+        if self.threshold <= 0:
+            return False
+
+        now = time.monotonic() if now is None else now
+
+        state = self._chats.get(chat_id)
+        if state is None:
+            state = self._chats[chat_id] = ChatRaidState(self.window)
+
+        if state.window.add(int(now)) > self.threshold:
+            if state.raid_until <= now:
+                RAIDS.inc()
+                logger.warning("Raid detected in chat %s, new members are banned for %s seconds", chat_id, self.duration)
+
+            state.raid_until = now + self.duration
+
+        return state.raid_until > now
+
+    def get_raid_remaining(self, chat_id: int, now: Optional[float] = None) -> float:
+        state = self._chats.get(chat_id)
+        if state is None:
+            return 0.0
+
+        now = time.monotonic() if now is None else now
+        return max(0.0, state.raid_until - now)
+
+
+raid_detector = RaidDetector(
+    threshold=config.raid_join_threshold,
+    window=config.raid_window,
+    duration=config.raid_duration
+)
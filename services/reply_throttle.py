@@ -0,0 +1,29 @@
+import time
+from collections import OrderedDict
+
+from config_reader import config
+
+
+class ReplyThrottle:
+    def __init__(self, window: float, max_size: int) -> None:
+        self.window = window
+        self.max_size = max_size
+        self._replied_at: OrderedDict[int, float] = OrderedDict()
+
+    def allow(self, user_id: int) -> bool:
+        now = time.monotonic()
+
+        replied_at = self._replied_at.get(user_id)
+        if replied_at is not None and now - replied_at < self.window:
+            return False
+
+        self._replied_at[user_id] = now
+        self._replied_at.move_to_end(user_id)
+
+        if len(self._replied_at) > self.max_size:
+            self._replied_at.popitem(last=False)
+
+        return True
+
+
+reply_throttle = ReplyThrottle(window=config.default_reply_window, max_size=config.default_reply_cache_size)
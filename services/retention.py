@@ -0,0 +1,78 @@
+import asyncio
+import logging
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from config_reader import config
+from database.engine import session_maker
+from database.orm_queries import add_missing_chat_daily_stats, delete_members_before
+from services.metrics import COMPACTED_MEMBERS
+
+
+logger = logging.getLogger(__name__)
+
+
+class MemberRetention:
+    def __init__(self, session_pool: async_sessionmaker, retention_days: int, interval: float, batch_size: int) -> None:
+        self.session_pool = session_pool
+        self.retention_days = retention_days
+        self.interval = interval
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+
+    def get_cutoff(self) -> datetime:
+        return datetime.combine(date.today() - timedelta(days=self.retention_days), time.min)
+
+    async def compact(self) -> int:
+        cutoff = self.get_cutoff()
+
+        async with self.session_pool() as session:
+            await add_missing_chat_daily_stats(session, cutoff)
+
+        compacted = 0
+        while True:
+            async with self.session_pool() as session:
+                deleted = await delete_members_before(session, cutoff, self.batch_size)
+
+            compacted += deleted
+            COMPACTED_MEMBERS.inc(amount=deleted)
+
+            if deleted < self.batch_size:
+                break
+
+            await asyncio.sleep(0)
+
+        logger.info("Compacted %s member rows older than %s", compacted, cutoff.date())
+        return compacted
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.compact()
+
+            except Exception:
+                logger.exception("Member retention job failed")
+
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self.retention_days > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+
+member_retention = MemberRetention(
+    session_pool=session_maker,
+    retention_days=config.member_retention_days,
+    interval=config.retention_interval,
+    batch_size=config.retention_batch_size
+)
@@ -0,0 +1,56 @@
+from typing import Union
+
+from aiogram.fsm.storage.base import BaseStorage
+from aiogram.fsm.storage.memory import MemoryStorage
+
+from config_reader import config
+from database.counters import JoinCounters, RedisJoinCounters
+
+
+class MemoryStateBackend:
+    def __init__(self) -> None:
+        self.join_counters = JoinCounters()
+
+    def create_storage(self) -> BaseStorage:
+        return MemoryStorage()
+
+    async def claim_ban(self, chat_id: int, user_id: int) -> bool:
+        return True
+
+    async def close(self) -> None:
+        pass
+
+
+class RedisStateBackend:
+    def __init__(self, url: str, prefix: str, ban_ttl: int) -> None:
+        from redis.asyncio import Redis
+
+        self.redis = Redis.from_url(url)
+        self.prefix = prefix
+        self.ban_ttl = ban_ttl
+        self.join_counters = RedisJoinCounters(self.redis, prefix)
+
+    def create_storage(self) -> BaseStorage:
+        from aiogram.fsm.storage.redis import DefaultKeyBuilder, RedisStorage
+
+        return RedisStorage(self.redis, key_builder=DefaultKeyBuilder(prefix=f"{self.prefix}:fsm"))
+
+    async def claim_ban(self, chat_id: int, user_id: int) -> bool:
+        return bool(await self.redis.set(f"{self.prefix}:ban:{chat_id}:{user_id}", 1, nx=True, ex=self.ban_ttl))
+
+    async def close(self) -> None:
+        await self.redis.aclose()
+
+
+StateBackend = Union[MemoryStateBackend, RedisStateBackend]
+
+
+def create_state_backend() -> StateBackend:
+    if config.state_backend == "redis":
+        return RedisStateBackend(config.redis_url, config.redis_prefix, config.ban_dedup_ttl)
+
+    return MemoryStateBackend()
+
+
+state_backend = create_state_backend()
+join_counters = state_backend.join_counters
@@ -0,0 +1,30 @@
+from typing import Any
+
+from aiogram.client.session.aiohttp import AiohttpSession
+
+from config_reader import config
+from middlewares.metrics import TelegramApiMetricsMiddleware
+from middlewares.retry import RetryRequestMiddleware
+
+
+class TelegramSession(AiohttpSession):
+    def __init__(self, keepalive_timeout: float, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self._connector_init["keepalive_timeout"] = keepalive_timeout
+
+
+def create_telegram_session() -> TelegramSession:
+    session = TelegramSession(
+        keepalive_timeout=config.telegram_keepalive_timeout,
+        limit=config.telegram_connection_limit,
+        timeout=config.telegram_request_timeout
+    )
+
+    session.middleware(RetryRequestMiddleware(
+        attempts=config.telegram_retry_attempts,
+        backoff=config.telegram_retry_backoff,
+        max_backoff=config.telegram_retry_max_backoff
+    ))
+    session.middleware(TelegramApiMetricsMiddleware())
+
+    return session
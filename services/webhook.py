@@ -0,0 +1,64 @@
+import asyncio
+import logging
+import signal
+from contextlib import suppress
+
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from aiohttp import web
+
+from config_reader import config
+
+
+logger = logging.getLogger(__name__)
+
+
+class WebhookRequestHandler(SimpleRequestHandler):
+    async def wait_background_tasks(self, app: web.Application) -> None:
+        if self._background_feed_update_tasks:
+            await asyncio.gather(*self._background_feed_update_tasks, return_exceptions=True)
+
+
+def create_webhook_app(dispatcher: Dispatcher, bot: Bot) -> web.Application:
+    app = web.Application()
+
+    handler = WebhookRequestHandler(
+        dispatcher=dispatcher,
+        bot=bot,
+        handle_in_background=True,
+        secret_token=config.webhook_secret.get_secret_value() if config.webhook_secret else None
+    )
+    app.on_shutdown.append(handler.wait_background_tasks)
+    setup_application(app, dispatcher, bot=bot)
+    handler.register(app, path=config.webhook_path)
+
+    return app
+
+
+async def run_webhook(dispatcher: Dispatcher, bot: Bot) -> None:
+    runner = web.AppRunner(create_webhook_app(dispatcher, bot))
+    await runner.setup()
+
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        with suppress(NotImplementedError):
+            loop.add_signal_handler(signal_number, stop_event.set)
+
+    try:
+        site = web.TCPSite(runner, config.webhook_host, config.webhook_port)
+        await site.start()
+        logger.info("Webhook server listening on %s:%s%s", config.webhook_host, config.webhook_port, config.webhook_path)
+
+        if config.webhook_base_url:
+            await bot.set_webhook(
+                url=f"{config.webhook_base_url.rstrip('/')}{config.webhook_path}",
+                secret_token=config.webhook_secret.get_secret_value() if config.webhook_secret else None,
+                allowed_updates=dispatcher.resolve_used_update_types(),
+                drop_pending_updates=True
+            )
+
+        await stop_event.wait()
+
+    finally:
+        await runner.cleanup()